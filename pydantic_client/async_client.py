@@ -1,9 +1,19 @@
+import asyncio
 import logging
-from typing import Any, Dict, Optional, TypeVar
+import time
+from urllib.parse import urlsplit
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar, Union
+)
 
 from pydantic import BaseModel
 
-from .base import BaseWebClient, RequestInfo
+from .base import BaseWebClient, ClientRequest, RequestInfo, _invoke
+from .cache import HttpCache
+from .codec import JsonCodec
+from .concurrency import AdaptiveConcurrencyLimiter
+from .metrics import TransportStats
+from .tracing import phase
 
 logger = logging.getLogger(__name__)
 
@@ -16,39 +26,424 @@ except ImportError:
 T = TypeVar('T', bound=BaseModel)
 
 
-class AiohttpWebClient(BaseWebClient):
+class _TransferTimings:
+    """
+    Transport timestamps and durations of one request, filled by the aiohttp trace config
+    or the httpx `trace` extension. `connect` stays None when a pooled connection is reused.
+    """
+    __slots__ = (
+        "start", "end", "dns_start", "dns", "connect_start", "connect", "tls_start", "tls",
+        "connected_at", "sent_at", "headers_at"
+    )
+
+    def __init__(self):
+        self.start = self.end = 0.0
+        self.dns_start = self.connect_start = self.tls_start = 0.0
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.tls: Optional[float] = None
+        self.connected_at: Optional[float] = None
+        self.sent_at: Optional[float] = None
+        self.headers_at: Optional[float] = None
+
+    async def httpx_trace(self, event: str, info: Dict[str, Any]) -> None:
+        """httpcore `trace` extension, TCP connect includes the DNS resolution"""
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started":
+            self.connect_start = now
+        elif event == "connection.connect_tcp.complete":
+            self.connect = now - self.connect_start
+        elif event == "connection.start_tls.started":
+            self.tls_start = now
+        elif event == "connection.start_tls.complete":
+            self.tls = now - self.tls_start
+        elif event.endswith(".send_request_headers.started"):
+            if self.connected_at is None:
+                self.connected_at = now
+        elif event.endswith(".send_request_body.complete"):
+            self.sent_at = now
+        elif event.endswith(".receive_response_headers.complete"):
+            self.headers_at = now
+
+
+def _traced(handler: Callable[[_TransferTimings, Any, float], None]) -> Callable:
+    """aiohttp trace callback updating the `_TransferTimings` passed as `trace_request_ctx`"""
+    async def on_signal(session, trace_config_ctx, params) -> None:
+        timings = trace_config_ctx.trace_request_ctx
+        if isinstance(timings, _TransferTimings):
+            handler(timings, params, time.perf_counter())
+    return on_signal
+
+
+def _on_dns_start(timings: _TransferTimings, params, now: float) -> None:
+    timings.dns_start = now
+
+
+def _on_dns_end(timings: _TransferTimings, params, now: float) -> None:
+    timings.dns = now - timings.dns_start
+
+
+def _on_connection_create_start(timings: _TransferTimings, params, now: float) -> None:
+    timings.connect_start = now
+
+
+def _on_connection_create_end(timings: _TransferTimings, params, now: float) -> None:
+    # aiohttp opens the TLS session within the connection, it is not timed on its own
+    timings.connect = now - timings.connect_start
+    timings.connected_at = now
+
+
+def _on_connection_reuse(timings: _TransferTimings, params, now: float) -> None:
+    timings.connected_at = now
+
+
+def _on_headers_sent(timings: _TransferTimings, params, now: float) -> None:
+    timings.sent_at = now
+
+
+def _transport_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(_traced(_on_dns_start))
+    trace_config.on_dns_resolvehost_end.append(_traced(_on_dns_end))
+    trace_config.on_connection_create_start.append(_traced(_on_connection_create_start))
+    trace_config.on_connection_create_end.append(_traced(_on_connection_create_end))
+    trace_config.on_connection_reuseconn.append(_traced(_on_connection_reuse))
+    trace_config.on_request_headers_sent.append(_traced(_on_headers_sent))
+    return trace_config
+
+
+class AsyncWebClient(BaseWebClient):
+    """Common lifecycle of the async clients: `async with client: ...` closes the session"""
+
+    _base_config_options = BaseWebClient._base_config_options + ("concurrency_limit", "transport_metrics")
+    # seconds between two reports of the concurrency limit to statsd
+    _concurrency_report_interval = 1.0
+
+    def __init__(
+        self,
+        *args,
+        concurrency_limit: Union[AdaptiveConcurrencyLimiter, str, Dict[str, Any], bool, None] = None,
+        transport_metrics: bool = False,
+        **kwargs
+    ):
+        """
+        Args:
+            concurrency_limit: adapt the number of in-flight requests of the client to the
+                latency and errors of the upstream, an `AdaptiveConcurrencyLimiter`, its keyword
+                arguments, its algorithm ("aimd" or "gradient") or True for the defaults
+            transport_metrics: trace DNS, connect, TLS, send and wait times and connection reuse
+                per host, reported to statsd and by `transport_stats()`
+        """
+        super().__init__(*args, **kwargs)
+        if concurrency_limit is True:
+            concurrency_limit = AdaptiveConcurrencyLimiter()
+        elif isinstance(concurrency_limit, str):
+            concurrency_limit = AdaptiveConcurrencyLimiter(concurrency_limit)
+        elif isinstance(concurrency_limit, dict):
+            concurrency_limit = AdaptiveConcurrencyLimiter(**concurrency_limit)
+        self.concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = concurrency_limit or None
+        self._concurrency_reported_at = 0.0
+        self.transport_metrics = transport_metrics
+        self._transport_stats = TransportStats()
+
+    async def _limited_request(self, request_info) -> Any:
+        """`_request` within the adaptive concurrency limit"""
+        limiter = self.concurrency_limiter
+        await limiter.acquire()
+        start = time.perf_counter()
+        rtt = None
+        dropped = False
+        try:
+            result = await self._request(request_info)
+            rtt = time.perf_counter() - start
+            return result
+        except Exception as exc:
+            rtt = time.perf_counter() - start
+            dropped = self._on_request_error(exc)
+            raise
+        finally:
+            limiter.release(rtt, dropped)
+            self._report_concurrency()
+
+    def _report_concurrency(self) -> None:
+        metrics = self._get_metrics()
+        if metrics is None:
+            return
+        now = time.monotonic()
+        if now - self._concurrency_reported_at < self._concurrency_report_interval:
+            return
+        self._concurrency_reported_at = now
+        metrics.concurrency(type(self).__name__, self.concurrency_limiter.limit, self.concurrency_limiter.queued)
+
+    def concurrency_stats(self) -> Optional[Dict[str, int]]:
+        """Current limit, in-flight and queued requests of the adaptive concurrency limit"""
+        return self.concurrency_limiter.stats() if self.concurrency_limiter else None
+
+    def _transfer_timings(self) -> Optional[_TransferTimings]:
+        """Timings to trace a request with, None when neither phase listeners nor transport metrics need them"""
+        if self._phase_listeners or self.transport_metrics:
+            return _TransferTimings()
+        return None
+
+    def _report_timings(self, request_info, url: str, timings: _TransferTimings) -> None:
+        if self._phase_listeners:
+            self._report_transfer(
+                request_info.function_name, timings.start, timings.connected_at, timings.headers_at, timings.end
+            )
+        # nothing traced, e.g. a session without the trace config
+        if not self.transport_metrics or timings.connected_at is None:
+            return
+        host = urlsplit(url).netloc
+        reused = timings.connect is None
+        self._transport_stats.record(host, reused)
+        metrics = self._get_metrics()
+        if metrics is None:
+            return
+        phases = {}
+        for name, seconds in (("dns", timings.dns), ("connect", timings.connect), ("tls", timings.tls)):
+            if seconds is not None:
+                phases[name] = seconds
+        if timings.sent_at is not None:
+            phases["send"] = timings.sent_at - timings.connected_at
+            if timings.headers_at is not None:
+                phases["wait"] = timings.headers_at - timings.sent_at
+        if timings.headers_at is not None:
+            phases["receive"] = timings.end - timings.headers_at
+        metrics.transport(type(self).__name__, host, reused, phases)
+
+    def transport_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Requests and connections per host with `transport_metrics`, e.g.
+
+        {"api.example.com:443": {"requests": 1520, "connections_created": 12,
+                                 "connections_reused": 1508, "reuse_ratio": 0.992}}
+
+        A low reuse ratio means connections are not kept alive long enough or the pool is too small.
+        """
+        return self._transport_stats.stats()
+
+    def _max_concurrency(self) -> int:
+        """Default concurrency of `map`, the connection pool size"""
+        return 100
+
+    def _resolve_call(self, method: Union[str, Callable[..., Awaitable]]) -> Callable[..., Awaitable]:
+        return getattr(self, method) if isinstance(method, str) else method
+
+    async def map(
+        self,
+        method: Union[str, Callable[..., Awaitable]],
+        items: Iterable[Any],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = True
+    ) -> List[Any]:
+        """
+        Call `method` once per item with at most `concurrency` calls in flight,
+        results are returned in the order of `items`.
+
+        ```python
+        users = await client.map(client.get_user, [{"user_id": 1}, {"user_id": 2}], concurrency=20)
+        users = await client.map("get_user", [1, 2])
+        ```
+
+        A failing call does not cancel the others: its exception is put in place of the result,
+        or raised once all calls finished when `return_exceptions` is False.
+        Without `concurrency` the pool size of the client is used.
+        """
+        call = self._resolve_call(method)
+        semaphore = asyncio.Semaphore(concurrency or self._max_concurrency())
+
+        async def run(item):
+            async with semaphore:
+                return await _invoke(call, item)
+
+        results = await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+        return results
+
+    async def map_as_completed(
+        self,
+        method: Union[str, Callable[..., Awaitable]],
+        items: Iterable[Any],
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Like `map`, but yield `(index, result_or_exception)` as soon as each call completes.
+        Calls still running are cancelled when the iteration is left early.
+        """
+        call = self._resolve_call(method)
+        semaphore = asyncio.Semaphore(concurrency or self._max_concurrency())
+
+        async def run(index, item):
+            async with semaphore:
+                try:
+                    return index, await _invoke(call, item)
+                except Exception as exc:
+                    return index, exc
+
+        tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        self.flush_metrics()
+
+    async def close(self) -> None:
+        await self.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class AiohttpWebClient(AsyncWebClient):
+    _config_options = ("limit", "limit_per_host", "keepalive_timeout", "ttl_dns_cache")
+    _transport_errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
     def __init__(
         self,
         base_url: str,
         headers: Optional[Dict[str, Any]] = None,
         timeout: Optional[int] =30,
         session: Optional[aiohttp.ClientSession] = None,
-        statsd_address: Optional[str] = None
+        statsd_address: Optional[str] = None,
+        json_codec: Union[str, JsonCodec] = "json",
+        http_cache: Union[bool, Dict[str, Any], HttpCache, None] = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: Optional[float] = 15,
+        ttl_dns_cache: Optional[int] = 10,
+        **kwargs
     ):
-        super().__init__(base_url, headers, timeout, session, statsd_address)
+        """
+        Args:
+            session: an `aiohttp.ClientSession` to use, it is not closed by `close()`.
+                Without it the client creates and owns one on the first request.
+            limit: max concurrent connections of the owned session, 0 for no limit
+            limit_per_host: max concurrent connections to the same host, 0 for no limit
+            keepalive_timeout: seconds an idle connection is kept open
+            ttl_dns_cache: seconds a resolved address is cached, None to cache forever
+            kwargs: retry and resilience options of `BaseWebClient`
+        """
+        super().__init__(base_url, headers, timeout, session, statsd_address, json_codec, http_cache, **kwargs)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.client_timeout = aiohttp.ClientTimeout(total=timeout)
+        self._owns_session = session is None
+
+    def _max_concurrency(self) -> int:
+        return self.limit or super()._max_concurrency()
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Connections of the session's `TCPConnector` per upstream, e.g.
 
-    async def _request(self, request_info: RequestInfo) -> Any:
+        {"https://api.example.com:443": {"maxsize": 10, "in_use": 10, "available": 0}}
+
+        `available` counts idle keep-alive connections, `maxsize` is `limit_per_host`,
+        else `limit`, 0 when unlimited. Empty before the first request.
+        """
+        connector = self.session.connector if self.session is not None else None
+        if connector is None or connector.closed:
+            return {}
+        maxsize = connector.limit_per_host or connector.limit
+        stats = {}
+        for key in set(connector._acquired_per_host) | set(connector._conns):
+            in_use = len(connector._acquired_per_host.get(key, ()))
+            available = len(connector._conns.get(key, ()))
+            if not in_use and not available:
+                continue
+            scheme = "https" if key.is_ssl else "http"
+            stats[f"{scheme}://{key.host}:{key.port}"] = {
+                "maxsize": maxsize,
+                "in_use": in_use,
+                "available": available
+            }
+        return stats
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or (self._owns_session and self.session.closed):
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache
+            )
+            # tracing costs on every request, only set up when the timings are used
+            trace_configs = None
+            if self._phase_listeners or self.transport_metrics:
+                trace_configs = [_transport_trace_config()]
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=self.client_timeout, trace_configs=trace_configs
+            )
+            self._owns_session = True
+        return self.session
+
+    async def aclose(self) -> None:
+        self.flush_metrics()
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _error_response(self, exc: BaseException) -> Tuple[Optional[int], Optional[Mapping[str, str]]]:
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status, exc.headers
+        return None, None
+
+    async def _request(self, request_info: Union[ClientRequest, RequestInfo]) -> Any:
         # Check if there's a mock response for this method
         mock_response = self._get_mock_response(request_info)
         if mock_response is not None:
             return mock_response
 
-        import aiohttp
-        request_params = self.dump_request_params(request_info)
-        response_model = request_params.pop("response_model")
-        extract_path = request_params.pop("response_extract_path", None)  # Get response extraction path parameter
+        with phase("serialize"):
+            request_params = self.dump_request_params(request_info)
+            response_model = request_params.pop("response_model")
+            extract_path = request_params.pop("response_extract_path", None)  # Get response extraction path parameter
 
-        request_params = self.before_request(request_params)
+            with self._timed_phase(request_info.function_name, "before_request"):
+                request_params = self.before_request(request_params)
+            request_params = self._encode_json_body(request_params)
 
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        cache_key, cached, fresh = self._http_cache_lookup(request_info, request_params)
+        if fresh:
+            return cached.value
 
-        async with self.session.request(**request_params) as response:
-            response.raise_for_status()
-            return self._cast_response_to_response_model(await response.content.read(), request_info)
+        timings = self._transfer_timings()
+        with phase("network"):
+            start = time.perf_counter()
+            async with self._get_session().request(
+                **request_params, timeout=self.client_timeout, trace_request_ctx=timings
+            ) as response:
+                headers_at = time.perf_counter()
+                self._note_response(request_info, request_params, response.status)
+                if cached is not None and response.status == 304:
+                    return self.http_cache.revalidated(cached, response.headers)
+                response.raise_for_status()
+                body = await response.content.read()
+                if timings is not None:
+                    timings.start, timings.headers_at, timings.end = start, headers_at, time.perf_counter()
+                    self._report_timings(request_info, request_params["url"], timings)
 
+        self._note_response_body(request_info, body)
+        with phase("parse"), self._timed_phase(request_info.function_name, "validate"):
+            result = self._cast_response_to_response_model(body, request_info)
+        self._http_cache_store(cache_key, request_params, response.status, response.headers, result)
+        return result
 
-class HttpxWebClient(BaseWebClient):
+
+class HttpxWebClient(AsyncWebClient):
+    _config_options = ("max_connections", "max_keepalive_connections", "keepalive_expiry", "http2")
 
     def __init__(
         self,
@@ -56,30 +451,123 @@ class HttpxWebClient(BaseWebClient):
         headers: Optional[Dict[str, Any]] = None,
         timeout: Optional[int] =30,
         session = None,
-        statsd_address: Optional[str] = None
+        statsd_address: Optional[str] = None,
+        json_codec: Union[str, JsonCodec] = "json",
+        http_cache: Union[bool, Dict[str, Any], HttpCache, None] = None,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        http2: bool = False,
+        **kwargs
     ):
-        super().__init__(base_url, headers, timeout, session, statsd_address)
+        """
+        Args:
+            session: an `httpx.AsyncClient` to use, it is not closed by `aclose()`.
+                Without it the client creates and owns a pooled one on the first request.
+            max_connections: max concurrent connections of the owned pool
+            max_keepalive_connections: max idle connections kept open
+            keepalive_expiry: seconds an idle connection is kept open
+            http2: enable HTTP/2, requires `httpx[http2]`
+            kwargs: retry and resilience options of `BaseWebClient`
+        """
+        super().__init__(base_url, headers, timeout, session, statsd_address, json_codec, http_cache, **kwargs)
         try:
             import httpx
         except ImportError:
             raise ImportError("please install httpx: `pip install httpx`")
 
-    async def _request(self, request_info: RequestInfo) -> Any:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self._owns_session = session is None
+        self._transport_errors = (httpx.TransportError,)
+
+    def _max_concurrency(self) -> int:
+        return self.limits.max_connections or super()._max_concurrency()
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Connections of the session's pool per upstream, e.g.
+
+        {"https://api.example.com:443": {"maxsize": 100, "in_use": 12, "available": 3}}
+
+        `available` counts idle keep-alive connections, `maxsize` is `max_connections`,
+        shared by all the upstreams, 0 when unlimited. Empty before the first request.
+        """
+        pool = getattr(getattr(self.session, "_transport", None), "_pool", None)
+        if pool is None:
+            return {}
+        maxsize = self.limits.max_connections or 0
+        stats: Dict[str, Dict[str, int]] = {}
+        for connection in pool.connections:
+            if connection.is_closed():
+                continue
+            origin = connection._origin
+            upstream = stats.setdefault(
+                f"{origin.scheme.decode()}://{origin.host.decode()}:{origin.port}",
+                {"maxsize": maxsize, "in_use": 0, "available": 0}
+            )
+            upstream["available" if connection.is_idle() else "in_use"] += 1
+        return stats
+
+    def _get_session(self):
+        if self.session is None or (self._owns_session and self.session.is_closed):
+            import httpx
+            self.session = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=self.http2)
+            self._owns_session = True
+        return self.session
+
+    async def aclose(self) -> None:
+        self.flush_metrics()
+        if self._owns_session and self.session is not None:
+            await self.session.aclose()
+            self.session = None
+
+    def _error_response(self, exc: BaseException) -> Tuple[Optional[int], Optional[Mapping[str, str]]]:
+        import httpx
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code, exc.response.headers
+        return None, None
+
+    async def _request(self, request_info: Union[ClientRequest, RequestInfo]) -> Any:
         # Check if there's a mock response for this method
         mock_response = self._get_mock_response(request_info)
         if mock_response is not None:
             return mock_response
             
         # No mock data, continue with the normal request
-        import httpx
-        request_params = self.dump_request_params(request_info)
-        response_model = request_params.pop("response_model")
-        extract_path = request_params.pop("response_extract_path", None)  # Get response extraction path parameter
+        with phase("serialize"):
+            request_params = self.dump_request_params(request_info)
+            response_model = request_params.pop("response_model")
+            extract_path = request_params.pop("response_extract_path", None)  # Get response extraction path parameter
+
+            with self._timed_phase(request_info.function_name, "before_request"):
+                request_params = self.before_request(request_params)
+            request_params = self._encode_json_body(request_params, body_key="content")
 
-        request_params = self.before_request(request_params)
+        cache_key, cached, fresh = self._http_cache_lookup(request_info, request_params)
+        if fresh:
+            return cached.value
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.request(**request_params)
-            response.raise_for_status()
+        timings = self._transfer_timings()
+        if timings is not None:
+            request_params["extensions"] = {"trace": timings.httpx_trace}
+        with phase("network"):
+            start = time.perf_counter()
+            response = await self._get_session().request(**request_params, timeout=self.timeout)
+        if timings is not None:
+            timings.start, timings.end = start, time.perf_counter()
+            self._report_timings(request_info, request_params["url"], timings)
+        self._note_response(request_info, request_params, response.status_code)
+        if cached is not None and response.status_code == 304:
+            return self.http_cache.revalidated(cached, response.headers)
+        response.raise_for_status()
 
-            return self._cast_response_to_response_model(response.content, request_info)
+        self._note_response_body(request_info, response.content)
+        with phase("parse"), self._timed_phase(request_info.function_name, "validate"):
+            result = self._cast_response_to_response_model(response.content, request_info)
+        self._http_cache_store(cache_key, request_params, response.status_code, response.headers, result)
+        return result
@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Mapping, Optional
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after they were stored.
+
+    `get` returns `MISSING` for unknown or expired keys, the least recently used entry
+    is evicted once `maxsize` entries are stored.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def request_key(
+    request_info: Any,
+    header_names: Iterable[str] = (),
+    default_headers: Optional[Mapping[str, Any]] = None
+) -> Hashable:
+    """
+    Identity of a request: method, formatted path, query params, body and the
+    selected headers (taken from the call headers, then from `default_headers`).
+    """
+    headers = request_info.headers or {}
+    default_headers = default_headers or {}
+    content = getattr(request_info, "content", None)
+    return (
+        request_info.method,
+        request_info.path,
+        _freeze(request_info.params),
+        content if content is not None else _freeze(request_info.json_data),
+        _freeze(request_info.data),
+        tuple((name, headers.get(name, default_headers.get(name))) for name in header_names),
+    )
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """'max-age=60, no-cache' -> {"max-age": "60", "no-cache": None}"""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class HttpCacheEntry:
+    __slots__ = ("value", "etag", "last_modified", "expires_at", "vary")
+
+    def __init__(self, value, etag, last_modified, expires_at, vary):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+        self.vary = vary
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Private (client side) HTTP cache for GET responses.
+
+    Follows `Cache-Control` (max-age, no-cache, no-store), `Expires`, `Age` and `Vary`:
+    a fresh entry is returned without a request, a stale one is revalidated with
+    `If-None-Match` / `If-Modified-Since` and reused on `304 Not Modified`.
+    Entries hold the parsed response, so a hit skips download and validation.
+    """
+
+    def __init__(self, maxsize: int = 256, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, HttpCacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    @staticmethod
+    def _vary_values(vary: Iterable[str], request_headers: Mapping[str, Any]) -> tuple:
+        lowered = {str(k).lower(): v for k, v in request_headers.items()}
+        return tuple((name, lowered.get(name)) for name in vary)
+
+    def lookup(self, key: Hashable, request_headers: Mapping[str, Any]) -> Optional[HttpCacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.vary != self._vary_values((name for name, _ in entry.vary), request_headers):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: HttpCacheEntry) -> bool:
+        fresh = entry.expires_at > self._clock()
+        if fresh:
+            self.hits += 1
+        return fresh
+
+    def _expires_at(self, directives: Dict[str, Optional[str]], response_headers: Mapping[str, str]) -> float:
+        now = self._clock()
+        if "no-cache" in directives:
+            return now
+        max_age = directives.get("max-age")
+        if max_age is not None and max_age.isdigit():
+            age = response_headers.get("Age")
+            return now + int(max_age) - (int(age) if age and age.isdigit() else 0)
+        expires = _http_date(response_headers.get("Expires"))
+        if expires is not None:
+            date = _http_date(response_headers.get("Date")) or now
+            return now + expires - date
+        return now
+
+    def store(
+        self,
+        key: Hashable,
+        request_headers: Mapping[str, Any],
+        response_headers: Mapping[str, str],
+        value: Any
+    ) -> None:
+        directives = parse_cache_control(response_headers.get("Cache-Control"))
+        vary = [name.strip().lower() for name in (response_headers.get("Vary") or "").split(",") if name.strip()]
+        if "no-store" in directives or "*" in vary:
+            return
+
+        entry = HttpCacheEntry(
+            value,
+            response_headers.get("ETag"),
+            response_headers.get("Last-Modified"),
+            self._expires_at(directives, response_headers),
+            self._vary_values(vary, request_headers)
+        )
+        # nothing to reuse: neither fresh nor revalidatable
+        if entry.expires_at <= self._clock() and not (entry.etag or entry.last_modified):
+            return
+
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def revalidated(self, entry: HttpCacheEntry, response_headers: Mapping[str, str]) -> Any:
+        """The server answered 304: refresh the freshness of the entry and reuse its value"""
+        directives = parse_cache_control(response_headers.get("Cache-Control"))
+        entry.expires_at = self._expires_at(directives, response_headers)
+        entry.etag = response_headers.get("ETag") or entry.etag
+        entry.last_modified = response_headers.get("Last-Modified") or entry.last_modified
+        self.revalidations += 1
+        return entry.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+        }
@@ -0,0 +1,73 @@
+import json
+from typing import Any, Union
+
+
+class JsonCodec:
+    """
+    Encode request bodies to bytes and decode json responses.
+
+    Subclass it to plug in another json library:
+    `MyClient(base_url, json_codec=MyCodec())`
+    """
+    name = "json"
+    content_type = "application/json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        try:
+            import orjson
+        except ImportError:
+            raise ImportError("please install orjson: `pip install orjson`")
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        try:
+            import msgspec
+        except ImportError:
+            raise ImportError("please install msgspec: `pip install msgspec`")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+
+_CODECS = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+
+def get_codec(codec: Union[str, JsonCodec, None] = None) -> JsonCodec:
+    """Resolve a codec name ("json", "orjson", "msgspec") or instance"""
+    if codec is None:
+        return JsonCodec()
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec not in _CODECS:
+        raise ValueError(f"Unknown json codec: {codec}, choose from {list(_CODECS)}")
+    return _CODECS[codec]()
@@ -0,0 +1,277 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Set
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe request coalescing: concurrent `do` calls with the same key
+    run `fn` once and all receive its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio request coalescing: concurrent `do` calls with the same key
+    await one `fn()` and all receive its result (or exception).
+    The shared call runs as its own task, cancelling any caller, the first one
+    included, does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # raised to the callers, do not warn when all of them were cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class AsyncBatchLoader:
+    """
+    DataLoader-style batching: keys passed to `load` within `window` seconds
+    (0: the same event-loop tick) are collected and fetched with one `load_many(keys)` call.
+
+    `load_many` returns either a mapping key -> item or a list of items, in which case
+    `key_of(item)` tells which key each item belongs to. Keys without an item resolve to None,
+    an exception of `load_many` is raised to every caller of the batch.
+    """
+
+    def __init__(
+        self,
+        load_many: Callable[[List[Hashable]], Awaitable[Any]],
+        key_of: Callable[[Any], Hashable],
+        window: float = 0,
+        max_size: int = 100
+    ):
+        self._load_many = load_many
+        self._key_of = key_of
+        self.window = window
+        self.max_size = max_size
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._handle: Optional[asyncio.Handle] = None
+        # running batches, the event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_size:
+                self._dispatch()
+            elif self._handle is None:
+                if self.window:
+                    self._handle = loop.call_later(self.window, self._dispatch)
+                else:
+                    self._handle = loop.call_soon(self._dispatch)
+        # a cancelled caller must not cancel the batch shared with other callers
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        try:
+            result = await self._load_many(list(batch))
+            items = result if isinstance(result, Mapping) else {self._key_of(item): item for item in result}
+        except BaseException as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+                    future.exception()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(items.get(key))
+
+
+class AIMDLimit:
+    """
+    Additive increase / multiplicative decrease: grow the limit by one while the limit is
+    being used, multiply it by `backoff_ratio` on a failed call or one slower than `timeout`.
+    """
+
+    def __init__(self, backoff_ratio: float = 0.9, timeout: Optional[float] = None):
+        self.backoff_ratio = backoff_ratio
+        self.timeout = timeout
+
+    def update(self, limit: float, rtt: float, inflight: int, dropped: bool) -> float:
+        if dropped or (self.timeout is not None and rtt > self.timeout):
+            return limit * self.backoff_ratio
+        if inflight * 2 >= limit:
+            return limit + 1
+        return limit
+
+
+class GradientLimit:
+    """
+    Latency gradient: the limit follows the ratio between the long term and the recent
+    round-trip time, plus a queue of sqrt(limit) to probe for more capacity.
+    A `tolerance` of 2 lets the recent latency double before the limit shrinks.
+    """
+
+    def __init__(self, tolerance: float = 1.5, smoothing: float = 0.2, long_window: int = 600, backoff_ratio: float = 0.9):
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff_ratio = backoff_ratio
+        self._long_decay = 2 / (long_window + 1)
+        self._long_rtt: Optional[float] = None
+        self._short_rtt: Optional[float] = None
+
+    def update(self, limit: float, rtt: float, inflight: int, dropped: bool) -> float:
+        if dropped:
+            return limit * self.backoff_ratio
+        if self._long_rtt is None:
+            self._long_rtt = self._short_rtt = rtt
+        self._short_rtt += 0.5 * (rtt - self._short_rtt)
+        self._long_rtt += self._long_decay * (rtt - self._long_rtt)
+        # recover faster once the latency got back to normal
+        if self._long_rtt / max(self._short_rtt, 1e-9) > 2:
+            self._long_rtt *= 0.95
+        # the limit is not being used, no signal
+        if inflight * 2 < limit:
+            return limit
+        gradient = max(0.5, min(1.0, self.tolerance * self._long_rtt / max(self._short_rtt, 1e-9)))
+        new_limit = limit * gradient + limit ** 0.5
+        return limit * (1 - self.smoothing) + new_limit * self.smoothing
+
+
+_LIMIT_ALGORITHMS = {"aimd": AIMDLimit, "gradient": GradientLimit}
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Async in-flight limit adjusted after each call from its latency and outcome by
+    `algorithm` ("aimd", "gradient" or an object with the `update` method of `AIMDLimit`).
+    Calls above the limit wait in FIFO order. Like the event loop, it is not thread-safe.
+    """
+
+    def __init__(
+        self,
+        algorithm: Any = "aimd",
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000
+    ):
+        if isinstance(algorithm, str):
+            try:
+                algorithm = _LIMIT_ALGORITHMS[algorithm]()
+            except KeyError:
+                raise ValueError(f"unknown concurrency limit algorithm {algorithm!r}, use one of {list(_LIMIT_ALGORITHMS)}")
+        self.algorithm = algorithm
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limit = float(initial_limit)
+        self.inflight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # the slot is taken by _wake_up on our behalf
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # woken up and cancelled at the same time: hand the slot over
+                self.inflight -= 1
+                self._wake_up()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self, rtt: Optional[float] = None, dropped: bool = False) -> None:
+        """Free the slot of a call; `rtt` None for calls that say nothing about the upstream"""
+        if rtt is not None:
+            limit = self.algorithm.update(self._limit, rtt, self.inflight, dropped)
+            self._limit = min(self.max_limit, max(self.min_limit, limit))
+        self.inflight -= 1
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        while self._waiters and self.inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "inflight": self.inflight, "queued": self.queued}
@@ -1,14 +1,21 @@
+import asyncio
 import inspect
 import re
+import time
 import warnings
 from functools import wraps
-from typing import Callable, Optional, Literal
+from typing import Any, Awaitable, Callable, Optional, Literal, Sequence, Union
 
 from pydantic import BaseModel
 
 from .base import PydanticClientValidationError
+from .cache import MISSING, request_key
+from .resilience import CircuitBreaker, HedgeTracker, RateLimiter, RetryPolicy
 from .tools.agno import register_agno_tool
-from .schema import RequestInfo
+from .schema import ClientRequest
+from .tracing import Span, _current_span, phase
+
+_PATH_PARAM_RE = re.compile(r'{([a-zA-Z_][a-zA-Z0-9_]*)}')
 
 def _extract_path_and_query(path: str):
     """
@@ -40,44 +47,160 @@ def _warn_if_path_params_missing(path: str, func: Callable):
     sig = inspect.signature(func)
     func_params = set(sig.parameters) - {"self"}
     path_part = path.split('?', 1)[0]
-    path_vars = set(re.findall(r'{([a-zA-Z_][a-zA-Z0-9_]*)}', path_part))
+    path_vars = set(_PATH_PARAM_RE.findall(path_part))
     missing = path_vars - func_params
     if missing:
         warnings.warn(
             f"Function '{func.__name__}' missing parameters {missing} required by path '{path}'"
         )
 
-def _process_request_params(
-    func: Callable, method: str, path: str, form_body: bool, response_extract_path: Optional[str] = None,
-    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body', *args, **kwargs
-) -> RequestInfo:
-    sig = inspect.signature(func)
-    bound_args = sig.bind(*args, **kwargs)
+_BODY_METHODS = frozenset(("POST", "PUT", "PATCH"))
+_UNRESOLVED = object()
+
+
+class _Endpoint:
+    """
+    Immutable per-endpoint plan, compiled once when the decorator runs.
+
+    Everything that only depends on the decorated function and the path
+    template (signature, path segments, query templates, response model)
+    is resolved here, so a call only has to bind arguments and assemble strings.
+    """
+    __slots__ = (
+        "func", "function_name", "method", "form_body", "response_extract_path",
+        "unknown_args_behavior", "signature", "path_segments", "path_params",
+        "query_tpls", "static_qs", "has_body", "_response_model",
+        "cache_ttl", "cache_maxsize", "cache_headers", "coalesce",
+        "batch_with", "batch_key", "batch_key_of", "batch_window", "batch_max_size", "retry",
+        "hedge_delay", "circuit_breaker", "rate_limit"
+    )
+
+    def __init__(
+        self,
+        func: Callable,
+        method: str,
+        path: str,
+        form_body: bool = False,
+        response_extract_path: Optional[str] = None,
+        unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body',
+        cache_ttl: Optional[float] = None,
+        cache_maxsize: int = 1024,
+        cache_headers: Sequence[str] = (),
+        coalesce: bool = False,
+        batch_with: Optional[str] = None,
+        batch_key: Optional[str] = None,
+        batch_result_key: Union[str, Callable[[Any], Any], None] = None,
+        batch_window: float = 0,
+        batch_max_size: int = 100,
+        retry: Union[RetryPolicy, bool, None] = None,
+        hedge_delay: Union[float, str, None] = None,
+        circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+        rate_limit: Union[RateLimiter, float, None] = None
+    ):
+        self.func = func
+        self.function_name = func.__name__
+        self.method = method
+        self.form_body = form_body
+        self.response_extract_path = response_extract_path
+        self.unknown_args_behavior = unknown_args_behavior
+        self.signature = inspect.signature(func)
+
+        raw_path, query_tpls, static_qs = _extract_path_and_query(path)
+        # "/users/{uid}/posts" -> ("/users/", "uid", "/posts"): literals on even
+        # positions, path parameter names on odd positions
+        self.path_segments = tuple(_PATH_PARAM_RE.split(raw_path))
+        self.path_params = tuple(self.path_segments[1::2])
+        self.query_tpls = tuple(query_tpls)
+        self.static_qs = tuple(static_qs)
+        self.has_body = method in _BODY_METHODS
+        self.cache_ttl = cache_ttl
+        self.cache_maxsize = cache_maxsize
+        self.cache_headers = tuple(cache_headers)
+        self.coalesce = coalesce
+        self.retry = retry
+        self.hedge_delay = hedge_delay
+        self.circuit_breaker = circuit_breaker
+        self.rate_limit = rate_limit
+        if hedge_delay is not None:
+            # fail at decoration time on an invalid delay
+            HedgeTracker(hedge_delay)
+
+        self.batch_with = batch_with
+        self.batch_window = batch_window
+        self.batch_max_size = batch_max_size
+        self.batch_key = batch_key
+        self.batch_key_of = None
+        if batch_with:
+            # only the key reaches the bulk method, any other argument would be dropped
+            args = [name for name in self.signature.parameters if name != "self"]
+            if len(args) != 1 or batch_key not in (None, args[0]):
+                raise ValueError(
+                    f"batched endpoint {self.function_name!r} must take exactly one argument, "
+                    f"its batch key, got {args}"
+                )
+            self.batch_key = batch_key = args[0]
+            self.batch_key_of = _item_key_getter(batch_result_key or batch_key)
+
+        self._response_model = _UNRESOLVED
+        try:
+            self._response_model = self._resolve_response_model()
+        except NameError:
+            # forward reference to a model declared after the client class,
+            # resolved on the first call instead
+            pass
+
+    def _resolve_response_model(self):
+        response_model = self.signature.return_annotation
+        if response_model is inspect.Signature.empty:
+            # no annotation, return the decoded json as is
+            return Any
+        if isinstance(response_model, str):
+            response_model = eval(response_model, inspect.unwrap(self.func).__globals__)
+        return response_model
+
+    @property
+    def response_model(self):
+        if self._response_model is _UNRESOLVED:
+            self._response_model = self._resolve_response_model()
+        return self._response_model
+
+    def format_path(self, params: dict) -> str:
+        segments = self.path_segments
+        if len(segments) == 1:
+            return segments[0]
+        parts = list(segments)
+        for i in range(1, len(parts), 2):
+            parts[i] = format(params[parts[i]])
+        return "".join(parts)
+
+
+def _item_key_getter(result_key: Union[str, Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    if callable(result_key):
+        return result_key
+
+    def key_of(item):
+        if isinstance(item, dict):
+            return item[result_key]
+        return getattr(item, result_key)
+
+    return key_of
+
+
+def _process_request_params(endpoint: _Endpoint, *args, **kwargs) -> ClientRequest:
+    bound_args = endpoint.signature.bind(*args, **kwargs)
     bound_args.apply_defaults()
     params = dict(bound_args.arguments)
     params.pop("self", None)
     request_headers = params.pop("request_headers", None)
 
-    response_model = sig.return_annotation
-    if isinstance(response_model, str):
-        response_model = eval(response_model)
-
-    raw_path, query_tpls, static_qs = _extract_path_and_query(path)
+    method = endpoint.method
+    formatted_path = endpoint.format_path(params)
 
-    used_in_path_params = []
-    format_path_data = {}
-    for k in re.findall(r'{([a-zA-Z_][a-zA-Z0-9_]*)}', raw_path):
-        format_path_data[k] = params[k]
-        used_in_path_params.append(k)
-    formatted_path = raw_path.format(**format_path_data)
-
-    query_params = {}
     # fill static qs
-    for k, v in static_qs:
-        query_params[k] = v
+    query_params = dict(endpoint.static_qs)
 
     # fill dynamic qs with overwrite
-    for k, v_name in query_tpls:
+    for k, v_name in endpoint.query_tpls:
         v = params.pop(v_name, None)
         if v is not None:
             query_params[k] = v
@@ -85,20 +208,24 @@ def _process_request_params(
     # if param used in path, but not used in query_string
     # need for support overlap test with path `/{keyword}?kw={keyword}`
     # and correct unknown_args_behavior=not_allow
-    for k in used_in_path_params:
-        if k in params:
-            del params[k]
+    for k in endpoint.path_params:
+        params.pop(k, None)
 
     body_data = None
-    for param_name, param_value in params.copy().items():
+    body_content = None
+    for param_name, param_value in list(params.items()):
         if isinstance(param_value, BaseModel):
             # rewrite body_data twice (or more) not allowed
-            if body_data is not None:
+            if body_data is not None or body_content is not None:
                 raise PydanticClientValidationError(f'Cannot put multiple data objects in request')
 
-            if method in ["POST", "PUT", "PATCH"]:
+            if endpoint.has_body:
                 # pydantic.Field(serialization_alias=...) works only with by_alias=True
-                body_data = param_value.model_dump(mode='json', by_alias=True)
+                if endpoint.form_body:
+                    body_data = param_value.model_dump(mode='json', by_alias=True)
+                else:
+                    # json body goes straight to bytes, without an intermediate dict
+                    body_content = param_value.model_dump_json(by_alias=True).encode()
 
                 # removing used params from variable
                 del params[param_name]
@@ -106,6 +233,7 @@ def _process_request_params(
                 raise PydanticClientValidationError(f'Cannot put body data in {method} request')
 
     if params:
+        unknown_args_behavior = endpoint.unknown_args_behavior
         # raise if params have non-used variables (probably error in path {var1} with arg another name)
         # example: path = '/?qs_dynamic={qs_11111}' with arg name 'qs_dynamic'
         # aka strict mode
@@ -116,30 +244,296 @@ def _process_request_params(
             query_params.update(params)
 
         if unknown_args_behavior == 'body':
-            if body_data is not None:
+            if body_data is not None or body_content is not None:
                 raise PydanticClientValidationError(f'Cannot fill body because is not empty')
             body_data = params
 
-    info = {
-        "method": method,
-        "path": formatted_path,
-        "params": query_params, # all request methods can have query_params
-        "json": (
-            body_data
-            if not form_body and method in ["POST", "PUT", "PATCH"]
-            else None
-        ),
-        "data": (
-            body_data
-            if form_body and method in ["POST", "PUT", "PATCH"]
-            else None
-        ),
-        "headers": request_headers,
-        "response_model": response_model,
-        "function_name": func.__name__,
-        "response_extract_path": response_extract_path
-    }
-    return RequestInfo.model_validate(info, by_alias=True)
+    has_body = endpoint.has_body
+    return ClientRequest(
+        method,
+        formatted_path,
+        params=query_params, # all request methods can have query_params
+        json_data=body_data if has_body and not endpoint.form_body else None,
+        data=body_data if has_body and endpoint.form_body else None,
+        headers=request_headers,
+        response_model=endpoint.response_model,
+        function_name=endpoint.function_name,
+        response_extract_path=endpoint.response_extract_path,
+        content=body_content
+    )
+
+def _coalesce_key(request_info: ClientRequest):
+    return request_key(request_info, tuple(request_info.headers or ()))
+
+
+def _request_sync(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    breaker = client._get_circuit_breaker(endpoint)
+    limiters = client._get_rate_limiters(endpoint)
+    if breaker is None and not limiters:
+        return client._request(request_info)
+
+    if breaker is not None:
+        breaker.allow()
+    start = time.perf_counter()
+    failed = None
+    try:
+        for limiter in limiters:
+            limiter.acquire()
+        start = time.perf_counter()
+        result = client._request(request_info)
+        failed = False
+        return result
+    except Exception as exc:
+        failed = client._on_request_error(exc, limiters)
+        raise
+    finally:
+        if breaker is not None:
+            breaker.record(time.perf_counter() - start, failed)
+
+
+def _attempt_sync(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    policy = client._get_retry_policy(endpoint)
+    if policy is None:
+        return _request_sync(client, endpoint, request_info)
+
+    client.retry_budget.deposit()
+    attempt = 1
+    while True:
+        try:
+            return _request_sync(client, endpoint, request_info)
+        except Exception as exc:
+            delay = client._retry_delay(policy, request_info, exc, attempt)
+            if delay is None:
+                raise
+        time.sleep(delay)
+        attempt += 1
+
+
+def _dispatch_async(client, request_info: ClientRequest) -> Awaitable:
+    if getattr(client, "concurrency_limiter", None) is None:
+        return client._request(request_info)
+    return client._limited_request(request_info)
+
+
+async def _hedged_async(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    """
+    Send a second request when the first one did not complete within the hedge delay,
+    return whichever succeeds first and cancel the other.
+    """
+    tracker = client._get_hedge_tracker(endpoint)
+    delay = tracker.delay()
+    start = time.perf_counter()
+    primary = asyncio.ensure_future(_dispatch_async(client, request_info))
+    hedge = None
+    try:
+        done, _ = await asyncio.wait((primary,), timeout=delay)
+        if done:
+            result = primary.result()
+            tracker.observe(time.perf_counter() - start)
+            return result
+
+        hedge = asyncio.ensure_future(_dispatch_async(client, request_info))
+        tracker.fired += 1
+        client._incr(endpoint.function_name, "hedge.fired")
+
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        tracker.won += 1
+                        client._incr(endpoint.function_name, "hedge.won")
+                    tracker.observe(time.perf_counter() - start)
+                    return task.result()
+        # both failed
+        return primary.result()
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+def _upstream_async(client, endpoint: _Endpoint, request_info: ClientRequest) -> Awaitable:
+    if endpoint.hedge_delay is None:
+        return _dispatch_async(client, request_info)
+    return _hedged_async(client, endpoint, request_info)
+
+
+async def _guarded_async(client, endpoint: _Endpoint, breaker, limiters, request_info: ClientRequest) -> Any:
+    if breaker is not None:
+        breaker.allow()
+    start = time.perf_counter()
+    failed = None
+    try:
+        for limiter in limiters:
+            await limiter.acquire_async()
+        start = time.perf_counter()
+        result = await _upstream_async(client, endpoint, request_info)
+        failed = False
+        return result
+    except Exception as exc:
+        failed = client._on_request_error(exc, limiters)
+        raise
+    finally:
+        if breaker is not None:
+            breaker.record(time.perf_counter() - start, failed)
+
+
+def _request_async(client, endpoint: _Endpoint, request_info: ClientRequest) -> Awaitable:
+    breaker = client._get_circuit_breaker(endpoint)
+    limiters = client._get_rate_limiters(endpoint)
+    if breaker is None and not limiters:
+        return _upstream_async(client, endpoint, request_info)
+    return _guarded_async(client, endpoint, breaker, limiters, request_info)
+
+
+async def _attempt_async(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    policy = client._get_retry_policy(endpoint)
+    if policy is None:
+        return await _request_async(client, endpoint, request_info)
+
+    client.retry_budget.deposit()
+    attempt = 1
+    while True:
+        try:
+            return await _request_async(client, endpoint, request_info)
+        except Exception as exc:
+            delay = client._retry_delay(policy, request_info, exc, attempt)
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def _send_sync(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    if endpoint.coalesce:
+        return client._single_flight.do(
+            _coalesce_key(request_info), lambda: _attempt_sync(client, endpoint, request_info)
+        )
+    return _attempt_sync(client, endpoint, request_info)
+
+
+async def _send_async(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    if endpoint.coalesce:
+        return await client._async_single_flight.do(
+            _coalesce_key(request_info), lambda: _attempt_async(client, endpoint, request_info)
+        )
+    return await _attempt_async(client, endpoint, request_info)
+
+
+def _call_sync(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    if not endpoint.cache_ttl:
+        return _send_sync(client, endpoint, request_info)
+
+    cache = client._get_response_cache(endpoint)
+    key = request_key(request_info, endpoint.cache_headers, client.headers)
+    result = cache.get(key)
+    if result is MISSING:
+        result = _send_sync(client, endpoint, request_info)
+        cache.set(key, result)
+    return result
+
+
+async def _call_async(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    if not endpoint.cache_ttl:
+        return await _send_async(client, endpoint, request_info)
+
+    cache = client._get_response_cache(endpoint)
+    key = request_key(request_info, endpoint.cache_headers, client.headers)
+    result = cache.get(key)
+    if result is MISSING:
+        result = await _send_async(client, endpoint, request_info)
+        cache.set(key, result)
+    return result
+
+
+def _measured_sync(client, endpoint: _Endpoint, request_info: ClientRequest) -> Any:
+    metrics = client._get_metrics()
+    if metrics is not None:
+        metrics.call_started(type(client).__name__, endpoint.function_name)
+    start = time.perf_counter()
+    try:
+        result = _call_sync(client, endpoint, request_info)
+    except Exception as exc:
+        client._record_call(endpoint.function_name, request_info, time.perf_counter() - start, exc)
+        raise
+    client._record_call(endpoint.function_name, request_info, time.perf_counter() - start, None)
+    return result
+
+
+async def _measured_async(client, endpoint: _Endpoint, request_info: Optional[ClientRequest], call: Awaitable) -> Any:
+    """Await `call` of `endpoint`, the request of `request_info` or a batched load without it"""
+    metrics = client._get_metrics()
+    if metrics is not None:
+        metrics.call_started(type(client).__name__, endpoint.function_name)
+    start = time.perf_counter()
+    try:
+        result = await call
+    except BaseException as exc:
+        # a cancelled call (`wait_for` timeout, abandoned `map_as_completed`) ends too
+        client._record_call(endpoint.function_name, request_info, time.perf_counter() - start, exc)
+        raise
+    client._record_call(endpoint.function_name, request_info, time.perf_counter() - start, None)
+    return result
+
+
+def _start_call_span(client, endpoint: _Endpoint):
+    """(span, context token) of a call below the current span, (None, None) outside of spans"""
+    parent = _current_span.get()
+    if parent is None:
+        return None, None
+    span = Span(f"{type(client).__name__}.{endpoint.function_name}", parent)
+    return span, _current_span.set(span)
+
+
+def _finish_call_span(span: Span, token, request_info: Optional[ClientRequest]) -> None:
+    span.finish()
+    _current_span.reset(token)
+    if request_info is not None:
+        span.attributes["method"] = request_info.method
+        span.attributes["path"] = request_info.path
+        if request_info.status is not None:
+            span.attributes["status"] = request_info.status
+
+
+def _run_sync(client, endpoint: _Endpoint, args: tuple, kwargs: dict) -> Any:
+    """A decorated call: its span when within one, the request building and the measured call"""
+    span, token = _start_call_span(client, endpoint)
+    request_info = None
+    try:
+        with phase("build"), client._timed_phase(endpoint.function_name, "process_params"):
+            request_info = _process_request_params(endpoint, client, *args, **kwargs)
+        return _measured_sync(client, endpoint, request_info)
+    except Exception as exc:
+        if span is not None:
+            span.attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        if span is not None:
+            _finish_call_span(span, token, request_info)
+
+
+async def _run_async(client, endpoint: _Endpoint, args: tuple, kwargs: dict) -> Any:
+    span, token = _start_call_span(client, endpoint)
+    request_info = None
+    try:
+        if endpoint.batch_with:
+            bound_args = endpoint.signature.bind(client, *args, **kwargs)
+            call = client._get_batch_loader(endpoint).load(bound_args.arguments[endpoint.batch_key])
+        else:
+            with phase("build"), client._timed_phase(endpoint.function_name, "process_params"):
+                request_info = _process_request_params(endpoint, client, *args, **kwargs)
+            call = _call_async(client, endpoint, request_info)
+        return await _measured_async(client, endpoint, request_info, call)
+    except Exception as exc:
+        if span is not None:
+            span.attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        if span is not None:
+            _finish_call_span(span, token, request_info)
+
 
 def rest(
     method: str, 
@@ -147,27 +541,70 @@ def rest(
     agno_tool: bool = False,
     tool_description: Optional[str] = None,
     response_extract_path: Optional[str] = None,
-    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body'
+    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body',
+    cache_ttl: Optional[float] = None,
+    cache_maxsize: int = 1024,
+    cache_headers: Sequence[str] = (),
+    coalesce: bool = False,
+    batch_with: Optional[str] = None,
+    batch_key: Optional[str] = None,
+    batch_result_key: Union[str, Callable[[Any], Any], None] = None,
+    batch_window: float = 0,
+    batch_max_size: int = 100,
+    retry: Union[RetryPolicy, bool, None] = None,
+    hedge_delay: Union[float, str, None] = None,
+    circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+    rate_limit: Union[RateLimiter, float, None] = None
 ) -> Callable:
+    """
+    Args:
+        cache_ttl: cache the parsed response for this many seconds, keyed on method,
+            formatted path, query params, body and `cache_headers`; the cached object
+            is returned as is, do not mutate it
+        cache_maxsize: max cached responses of this endpoint, least recently used are evicted
+        cache_headers: header names that are part of the cache key, e.g. ("Authorization",)
+        coalesce: concurrent identical calls (same path, params, body and headers) share
+            one in-flight request and its result
+        batch_with: name of a bulk method of the client taking a list of keys; with the async
+            clients, calls made within `batch_window` seconds (0: the same event-loop tick) are
+            sent as one bulk call of at most `batch_max_size` keys and the result is split back
+            per key. The endpoint must take a single argument, the key; sync clients send single
+            requests. Batched calls get their span and metrics, the response cache, coalescing,
+            retries and resilience options of the bulk method apply to the bulk call.
+        batch_key: name of that argument, optional
+        batch_result_key: attribute / dict key (or callable) giving the key of each item returned
+            by the bulk method when it returns a list, defaults to `batch_key`
+        retry: `RetryPolicy` of this endpoint, False to never retry it,
+            None to use the `retry_policy` of the client
+        hedge_delay: async clients only, for idempotent endpoints: send a second request when the
+            first did not complete within this many seconds, or within an observed latency
+            percentile such as "p95"; the first successful response wins, the other is cancelled
+        circuit_breaker: `CircuitBreaker` settings of this endpoint, False to never break it,
+            None to use the `circuit_breaker` of the client
+        rate_limit: requests per second of this endpoint, on top of the `rate_limit` of the client;
+            a number gives each client instance its own limiter, a `RateLimiter` is shared as is
+    """
     def decorator(path: str) -> Callable:
         def wrapper(func: Callable) -> Callable:
             _warn_if_path_params_missing(path, func)
             if agno_tool:
                 func = register_agno_tool(tool_description)(func)
+            endpoint = _Endpoint(
+                func, method, path, form_body, response_extract_path, unknown_args_behavior,
+                cache_ttl=cache_ttl, cache_maxsize=cache_maxsize, cache_headers=cache_headers,
+                coalesce=coalesce, batch_with=batch_with, batch_key=batch_key,
+                batch_result_key=batch_result_key, batch_window=batch_window, batch_max_size=batch_max_size,
+                retry=retry, hedge_delay=hedge_delay, circuit_breaker=circuit_breaker,
+                rate_limit=rate_limit
+            )
 
             @wraps(func)
             async def async_wrapped(self, *args, **kwargs):
-                request_params = _process_request_params(
-                    func, method, path, form_body, response_extract_path, unknown_args_behavior, self, *args, **kwargs
-                )
-                return await self._request(request_params)
+                return await _run_async(self, endpoint, args, kwargs)
 
             @wraps(func)
             def sync_wrapped(self, *args, **kwargs):
-                request_params = _process_request_params(
-                    func, method, path, form_body, response_extract_path, unknown_args_behavior, self, *args, **kwargs
-                )
-                return self._request(request_params)
+                return _run_sync(self, endpoint, args, kwargs)
 
             @wraps(func)
             def choose_wrapper(self, *args, **kwargs):
@@ -187,14 +624,40 @@ def get(
     agno_tool: bool = False,
     tool_description: Optional[str] = None,
     response_extract_path: Optional[str] = None,
-    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body'
+    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body',
+    cache_ttl: Optional[float] = None,
+    cache_maxsize: int = 1024,
+    cache_headers: Sequence[str] = (),
+    coalesce: bool = False,
+    batch_with: Optional[str] = None,
+    batch_key: Optional[str] = None,
+    batch_result_key: Union[str, Callable[[Any], Any], None] = None,
+    batch_window: float = 0,
+    batch_max_size: int = 100,
+    retry: Union[RetryPolicy, bool, None] = None,
+    hedge_delay: Union[float, str, None] = None,
+    circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+    rate_limit: Union[RateLimiter, float, None] = None
 ) -> Callable:
     return rest(
         "GET", 
         agno_tool=agno_tool, 
         tool_description=tool_description,
         response_extract_path=response_extract_path,
-        unknown_args_behavior=unknown_args_behavior
+        unknown_args_behavior=unknown_args_behavior,
+        cache_ttl=cache_ttl,
+        cache_maxsize=cache_maxsize,
+        cache_headers=cache_headers,
+        coalesce=coalesce,
+        batch_with=batch_with,
+        batch_key=batch_key,
+        batch_result_key=batch_result_key,
+        batch_window=batch_window,
+        batch_max_size=batch_max_size,
+        retry=retry,
+        hedge_delay=hedge_delay,
+        circuit_breaker=circuit_breaker,
+        rate_limit=rate_limit
     )(path)
 
 
@@ -203,14 +666,20 @@ def delete(
     agno_tool: bool = False,
     tool_description: Optional[str] = None,
     response_extract_path: Optional[str] = None,
-    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body'
+    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body',
+    retry: Union[RetryPolicy, bool, None] = None,
+    circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+    rate_limit: Union[RateLimiter, float, None] = None
 ) -> Callable:
     return rest(
         "DELETE", 
         agno_tool=agno_tool, 
         tool_description=tool_description,
         response_extract_path=response_extract_path,
-        unknown_args_behavior=unknown_args_behavior
+        unknown_args_behavior=unknown_args_behavior,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+        rate_limit=rate_limit
     )(path)
 
 
@@ -220,7 +689,10 @@ def post(
     agno_tool: bool = False,
     tool_description: Optional[str] = None,
     response_extract_path: Optional[str] = None,
-    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body'
+    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body',
+    retry: Union[RetryPolicy, bool, None] = None,
+    circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+    rate_limit: Union[RateLimiter, float, None] = None
 ) -> Callable:
     return rest(
         "POST", 
@@ -228,7 +700,10 @@ def post(
         agno_tool=agno_tool, 
         tool_description=tool_description,
         response_extract_path=response_extract_path,
-        unknown_args_behavior=unknown_args_behavior
+        unknown_args_behavior=unknown_args_behavior,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+        rate_limit=rate_limit
     )(path)
 
 
@@ -238,7 +713,10 @@ def put(
     agno_tool: bool = False,
     tool_description: Optional[str] = None,
     response_extract_path: Optional[str] = None,
-    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body'
+    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body',
+    retry: Union[RetryPolicy, bool, None] = None,
+    circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+    rate_limit: Union[RateLimiter, float, None] = None
 ) -> Callable:
     return rest(
         "PUT", 
@@ -246,7 +724,10 @@ def put(
         agno_tool=agno_tool, 
         tool_description=tool_description,
         response_extract_path=response_extract_path,
-        unknown_args_behavior=unknown_args_behavior
+        unknown_args_behavior=unknown_args_behavior,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+        rate_limit=rate_limit
     )(path)
 
 
@@ -256,7 +737,10 @@ def patch(
     agno_tool: bool = False,
     tool_description: Optional[str] = None,
     response_extract_path: Optional[str] = None,
-    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body'
+    unknown_args_behavior: Literal['query', 'body', 'not_allow'] = 'body',
+    retry: Union[RetryPolicy, bool, None] = None,
+    circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+    rate_limit: Union[RateLimiter, float, None] = None
 ) -> Callable:
     return rest(
         "PATCH", 
@@ -264,5 +748,8 @@ def patch(
         agno_tool=agno_tool, 
         tool_description=tool_description,
         response_extract_path=response_extract_path,
-        unknown_args_behavior=unknown_args_behavior
+        unknown_args_behavior=unknown_args_behavior,
+        retry=retry,
+        circuit_breaker=circuit_breaker,
+        rate_limit=rate_limit
     )(path)
@@ -0,0 +1,275 @@
+import atexit
+import math
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# buffers flushed when the interpreter exits
+_buffers: "weakref.WeakSet[StatsdMetrics]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_buffers() -> None:
+    for buffer in list(_buffers):
+        buffer.flush()
+
+
+class StatsdMetrics:
+    """
+    Buffers metrics in memory and sends them through a statsd pipeline, which packs
+    them in as few UDP packets as possible.
+
+    The buffer is sent once it holds `max_buffer` metrics, or at the latest `flush_interval`
+    seconds after its first metric, by a timer thread; `flush()` sends it right away, and
+    what is left is sent when the interpreter exits.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        flush_interval: float = 1.0,
+        max_buffer: int = 100,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.client = client
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple[str, str, float]] = []
+        self._flushed_at = clock()
+        self._timer: Optional[threading.Timer] = None
+        _buffers.add(self)
+
+    def timing(self, stat: str, ms: float) -> None:
+        self._add("timing", stat, ms)
+
+    def incr(self, stat: str, count: int = 1) -> None:
+        self._add("incr", stat, count)
+
+    def gauge(self, stat: str, value: float) -> None:
+        self._add("gauge", stat, value)
+
+    def _add(self, kind: str, stat: str, value: float) -> None:
+        with self._lock:
+            self._buffer.append((kind, stat, value))
+            if len(self._buffer) < self.max_buffer and self._clock() - self._flushed_at < self.flush_interval:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.flush_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            buffer = self._take()
+        self._send(buffer)
+
+    def _take(self) -> List[Tuple[str, str, float]]:
+        buffer, self._buffer = self._buffer, []
+        self._flushed_at = self._clock()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return buffer
+
+    def flush(self) -> None:
+        with self._lock:
+            buffer = self._take()
+        self._send(buffer)
+
+    def _send(self, buffer: List[Tuple[str, str, float]]) -> None:
+        if not buffer:
+            return
+        pipeline = getattr(self.client, "pipeline", None)
+        target = pipeline() if pipeline is not None else self.client
+        for kind, stat, value in buffer:
+            getattr(target, kind)(stat, value)
+        if pipeline is not None:
+            target.send()
+
+
+class MetricsBackend:
+    """
+    Receives the metrics of the clients using it, see `BaseWebClient(metrics=...)`.
+    `client` is the client class name and durations are in seconds; every method
+    is a no-op here, a backend overrides the ones it exports.
+    """
+
+    def bind(self, client: Any) -> None:
+        """Called with each client instance reporting to this backend"""
+
+    def call_started(self, client: str, endpoint: str) -> None:
+        """A decorated call started, it is followed by `call_finished`"""
+
+    def call_finished(
+        self,
+        client: str,
+        endpoint: str,
+        seconds: float,
+        status: Optional[int],
+        error: bool,
+        request_bytes: Optional[int],
+        response_bytes: Optional[int]
+    ) -> None:
+        ...
+
+    def endpoint_event(self, client: str, endpoint: str, event: str) -> None:
+        """Something happened to a call of `endpoint`, e.g. `hedge.fired`"""
+
+    def concurrency(self, client: str, limit: int, queued: int) -> None:
+        """Adaptive concurrency limit of an async client and the calls waiting for it"""
+
+    def transport(self, client: str, host: str, reused: bool, phases: Dict[str, float]) -> None:
+        """Connection reuse and transport phases (dns, connect, tls, send, wait, receive) of a request"""
+
+    def span(self, name: str, seconds: float) -> None:
+        """A `client.span(name)` block ended"""
+
+    def flush(self) -> None:
+        """Send what is buffered, called by `client.close()`"""
+
+
+class StatsdBackend(MetricsBackend):
+    """
+    Sends the metrics to a `statsd.StatsClient`, the backend of `statsd_address`. Call and
+    transport metrics go through a `StatsdMetrics` buffer, events and gauges are sent right away.
+    """
+
+    def __init__(self, client: Any, **buffer_options):
+        self.client = client
+        self.buffer = StatsdMetrics(client, **buffer_options)
+
+    def call_finished(self, client, endpoint, seconds, status, error, request_bytes, response_bytes) -> None:
+        prefix = f"{client}.{endpoint}"
+        self.buffer.timing(f"{prefix}.latency", seconds * 1000)
+        if status is not None:
+            self.buffer.incr(f"{prefix}.status.{status}")
+        if error:
+            self.buffer.incr(f"{prefix}.errors")
+        if request_bytes:
+            self.buffer.incr(f"{prefix}.request_bytes", request_bytes)
+        if response_bytes:
+            self.buffer.incr(f"{prefix}.response_bytes", response_bytes)
+
+    def endpoint_event(self, client: str, endpoint: str, event: str) -> None:
+        self.client.incr(f"{client}.{endpoint}.{event}")
+
+    def concurrency(self, client: str, limit: int, queued: int) -> None:
+        self.client.gauge(f"{client}.concurrency.limit", limit)
+        self.client.gauge(f"{client}.concurrency.queued", queued)
+
+    def transport(self, client: str, host: str, reused: bool, phases: Dict[str, float]) -> None:
+        prefix = f"{client}.transport.{host.replace('.', '_').replace(':', '_')}"
+        self.buffer.incr(f"{prefix}.connections.{'reused' if reused else 'created'}")
+        for name, seconds in phases.items():
+            self.buffer.timing(f"{prefix}.{name}", seconds * 1000)
+
+    def span(self, name: str, seconds: float) -> None:
+        self.client.timing(f"{name}.elapsed", int(seconds * 1000))
+
+    def flush(self) -> None:
+        self.buffer.flush()
+
+
+class TransportStats:
+    """Requests and connections opened or reused per upstream host, see `transport_stats()`"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # host -> [requests, connections created]
+        self._hosts: Dict[str, List[int]] = {}
+
+    def record(self, host: str, reused: bool) -> None:
+        with self._lock:
+            counts = self._hosts.get(host)
+            if counts is None:
+                counts = self._hosts[host] = [0, 0]
+            counts[0] += 1
+            if not reused:
+                counts[1] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = {host: tuple(counts) for host, counts in self._hosts.items()}
+        return {
+            host: {
+                "requests": requests,
+                "connections_created": created,
+                "connections_reused": requests - created,
+                "reuse_ratio": (requests - created) / requests
+            }
+            for host, (requests, created) in hosts.items()
+        }
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram of one endpoint, with logarithmic buckets growing by
+    `1 + precision` from `min_value` to `max_value` seconds: a percentile is within
+    `precision` of the exact value, shorter and longer latencies land in the first and last bucket.
+    """
+
+    def __init__(self, min_value: float = 1e-5, max_value: float = 600.0, precision: float = 0.02):
+        self.min_value = min_value
+        self._log_growth = math.log1p(precision)
+        self._growth = 1 + precision
+        self._counts = [0] * (int(math.log(max_value / min_value) / self._log_growth) + 2)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, seconds: float) -> int:
+        if seconds <= self.min_value:
+            return 0
+        return min(int(math.log(seconds / self.min_value) / self._log_growth) + 1, len(self._counts) - 1)
+
+    def record(self, seconds: float, error: bool = False, cancelled: bool = False) -> None:
+        """A call of `seconds`; a cancelled call, such as a timeout, is an error too"""
+        index = self._index(seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if error or cancelled:
+                self.errors += 1
+            if cancelled:
+                self.cancelled += 1
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency in seconds below which `q` percent of the calls completed, None without calls"""
+        with self._lock:
+            return self._percentile(q)
+
+    def _percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self._counts[:-1]):
+            seen += count
+            if seen >= rank:
+                # upper bound of the bucket, never above the largest latency seen
+                return min(self.min_value * self._growth ** index, self.max)
+        # in the overflow bucket
+        return self.max
+
+    def snapshot(self, percentiles: Iterable[float] = (50, 90, 99)) -> Dict[str, Any]:
+        """Calls, errors and latencies in ms, e.g. {"count": 10, "errors": 1, "cancelled": 0,
+        "error_rate": 0.1, "mean_ms": 12.5, "p50_ms": 11.8, "p90_ms": 20.1, "p99_ms": 31.0, "max_ms": 31.2}"""
+        with self._lock:
+            stats = {
+                "count": self.count,
+                "errors": self.errors,
+                "cancelled": self.cancelled,
+                "error_rate": self.errors / self.count if self.count else 0.0,
+                "mean_ms": 1000 * self.total / self.count if self.count else None
+            }
+            for q in percentiles:
+                value = self._percentile(q)
+                stats[f"p{q:g}_ms"] = None if value is None else 1000 * value
+            stats["max_ms"] = 1000 * self.max if self.count else None
+        return stats
@@ -0,0 +1,204 @@
+import bisect
+import threading
+import weakref
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .metrics import MetricsBackend
+
+# Content-Type of `OpenMetricsRegistry.exposition()`
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# name -> (type, help)
+_FAMILIES = {
+    "request_duration_seconds": ("histogram", "Duration of the decorated calls"),
+    "requests_in_flight": ("gauge", "Decorated calls in progress"),
+    "responses": ("counter", "HTTP responses per status code"),
+    "errors": ("counter", "Failed decorated calls"),
+    "request_bytes": ("counter", "Request body bytes sent"),
+    "response_bytes": ("counter", "Response body bytes received"),
+    "endpoint_events": ("counter", "Hedged requests fired and won"),
+    "concurrency_limit": ("gauge", "Adaptive concurrency limit"),
+    "concurrency_queued": ("gauge", "Calls waiting for the adaptive concurrency limit"),
+    "connections": ("counter", "Requests per host on a created or a reused connection"),
+    "transport_duration_seconds": ("histogram", "Transport phases of the requests"),
+    "span_duration_seconds": ("histogram", "Duration of the client.span() blocks"),
+    "pool_connections": ("gauge", "Connections of the pools per state"),
+    "pool_max_connections": ("gauge", "Size of the connection pools"),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        # one count per bucket bound, and one above them
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class OpenMetricsRegistry(MetricsBackend):
+    """
+    In-process registry of the client metrics, rendered in the OpenMetrics text format
+    (read by Prometheus) by `exposition()`; no server is started, serve it from an
+    existing `/metrics` route:
+
+    ```python
+    registry = OpenMetricsRegistry()
+    client = MyAPIClient(base_url="https://api.example.com", metrics=registry)
+
+    @app.get("/metrics")
+    def metrics():
+        return Response(registry.exposition(), media_type=CONTENT_TYPE)
+    ```
+
+    One registry can be shared by several clients, labelled with their class name.
+    Metric names are prefixed with `namespace`, latency histograms use `buckets` (seconds).
+    """
+
+    def __init__(self, namespace: str = "pydantic_client", buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._clients: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def bind(self, client: Any) -> None:
+        self._clients.add(client)
+
+    def _add(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            values = self._values.setdefault(name, {})
+            values[labels] = values.get(labels, 0) + value
+
+    def _set(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            self._values.setdefault(name, {})[labels] = value
+
+    def _observe(self, name: str, labels: Labels, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            histogram = histograms.get(labels)
+            if histogram is None:
+                histogram = histograms[labels] = _Histogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    def call_started(self, client: str, endpoint: str) -> None:
+        self._add("requests_in_flight", (("client", client), ("endpoint", endpoint)), 1)
+
+    def call_finished(self, client, endpoint, seconds, status, error, request_bytes, response_bytes) -> None:
+        labels = (("client", client), ("endpoint", endpoint))
+        self._add("requests_in_flight", labels, -1)
+        self._observe("request_duration_seconds", labels, seconds)
+        if status is not None:
+            self._add("responses", labels + (("status", str(status)),), 1)
+        if error:
+            self._add("errors", labels, 1)
+        if request_bytes:
+            self._add("request_bytes", labels, request_bytes)
+        if response_bytes:
+            self._add("response_bytes", labels, response_bytes)
+
+    def endpoint_event(self, client: str, endpoint: str, event: str) -> None:
+        self._add("endpoint_events", (("client", client), ("endpoint", endpoint), ("event", event)), 1)
+
+    def concurrency(self, client: str, limit: int, queued: int) -> None:
+        self._set("concurrency_limit", (("client", client),), limit)
+        self._set("concurrency_queued", (("client", client),), queued)
+
+    def transport(self, client: str, host: str, reused: bool, phases: Dict[str, float]) -> None:
+        labels = (("client", client), ("host", host))
+        self._add("connections", labels + (("state", "reused" if reused else "created"),), 1)
+        for phase, seconds in phases.items():
+            self._observe("transport_duration_seconds", labels + (("phase", phase),), seconds)
+
+    def span(self, name: str, seconds: float) -> None:
+        self._observe("span_duration_seconds", (("span", name),), seconds)
+
+    def _pool_values(self) -> Dict[str, Dict[Labels, float]]:
+        """Connection pool gauges of the clients having `pool_stats()`, summed per client class"""
+        values: Dict[str, Dict[Labels, float]] = {"pool_connections": {}, "pool_max_connections": {}}
+        for client in list(self._clients):
+            pool_stats = getattr(client, "pool_stats", None)
+            if pool_stats is None:
+                continue
+            client_name = type(client).__name__
+            for pool, stats in pool_stats().items():
+                labels = (("client", client_name), ("pool", pool))
+                for name, state_labels, value in (
+                    ("pool_connections", labels + (("state", "in_use"),), stats["in_use"]),
+                    ("pool_connections", labels + (("state", "available"),), stats["available"]),
+                    ("pool_max_connections", labels, stats["maxsize"]),
+                ):
+                    values[name][state_labels] = values[name].get(state_labels, 0) + value
+        return values
+
+    def exposition(self) -> str:
+        """The metrics in the OpenMetrics text format, see `CONTENT_TYPE`"""
+        pool_values = self._pool_values()
+        with self._lock:
+            values = {name: dict(samples) for name, samples in self._values.items()}
+            histograms = {
+                name: {labels: (list(h.counts), h.sum, h.count) for labels, h in samples.items()}
+                for name, samples in self._histograms.items()
+            }
+        values.update((name, samples) for name, samples in pool_values.items() if samples)
+
+        lines: List[str] = []
+        for name, (kind, help_text) in _FAMILIES.items():
+            family = f"{self.namespace}_{name}"
+            if kind == "histogram":
+                samples = histograms.get(name)
+            else:
+                samples = values.get(name)
+            if not samples:
+                continue
+            lines.append(f"# TYPE {family} {kind}")
+            lines.append(f"# HELP {family} {help_text}")
+            if kind == "histogram":
+                for labels, (counts, total, count) in samples.items():
+                    lines.extend(self._histogram_lines(family, labels, counts, total, count))
+            else:
+                suffix = "_total" if kind == "counter" else ""
+                for labels, value in samples.items():
+                    lines.append(f"{family}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _histogram_lines(
+        self, family: str, labels: Labels, counts: List[int], total: float, count: int
+    ) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (None,), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound is None else repr(float(bound))
+            lines.append(f"{family}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{family}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{family}_count{_format_labels(labels)} {count}")
+        return lines
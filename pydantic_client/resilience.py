@@ -0,0 +1,385 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Collection, Deque, Dict, Iterable, Mapping, Optional, Tuple, Type, Union
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"))
+
+
+def parse_retry_after(value: Optional[str], clock: Callable[[], float] = time.time) -> Optional[float]:
+    """`Retry-After` in seconds, from a number of seconds or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - clock())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RetryBudget:
+    """
+    Client-wide cap on retries to avoid retry storms: over the last `ttl` seconds,
+    retries may not exceed `ratio` of the requests plus `min_retries_per_second`.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 10,
+        ttl: int = 10,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # per second buckets of [second, requests, retries]
+        self._buckets = [[0, 0, 0] for _ in range(ttl)]
+
+    def _bucket(self) -> list:
+        second = int(self._clock())
+        bucket = self._buckets[second % self.ttl]
+        if bucket[0] != second:
+            bucket[:] = [second, 0, 0]
+        return bucket
+
+    def _window(self) -> Tuple[int, int]:
+        oldest = int(self._clock()) - self.ttl
+        requests = retries = 0
+        for second, bucket_requests, bucket_retries in self._buckets:
+            if second > oldest:
+                requests += bucket_requests
+                retries += bucket_retries
+        return requests, retries
+
+    def deposit(self) -> None:
+        """Record a request"""
+        with self._lock:
+            self._bucket()[1] += 1
+
+    def withdraw(self) -> bool:
+        """Record a retry if the budget allows it"""
+        with self._lock:
+            requests, retries = self._window()
+            if retries >= self.min_retries_per_second * self.ttl + self.ratio * requests:
+                return False
+            self._bucket()[2] += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed call.
+
+    Args:
+        max_attempts: attempts including the first one
+        statuses: HTTP status codes worth retrying
+        exceptions: exception types worth retrying, defaults to the transport errors
+            (connection, timeout) of the client backend
+        methods: HTTP methods that may be retried, idempotent ones by default
+        backoff_base / backoff_max: exponential backoff `base * 2 ** (attempt - 1)` capped at `max`
+        jitter: wait a random time between 0 and the backoff ("full jitter")
+        respect_retry_after: wait `Retry-After` when the response has it; a value above
+            `backoff_max` gives up instead of retrying too early
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        statuses: Collection[int] = (429, 500, 502, 503, 504),
+        exceptions: Optional[Iterable[Type[BaseException]]] = None,
+        methods: Collection[str] = IDEMPOTENT_METHODS,
+        backoff_base: float = 0.1,
+        backoff_max: float = 10.0,
+        jitter: bool = True,
+        respect_retry_after: bool = True
+    ):
+        self.max_attempts = max_attempts
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions) if exceptions is not None else None
+        self.methods = frozenset(method.upper() for method in methods)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+
+    def is_retryable(
+        self,
+        method: str,
+        exc: BaseException,
+        status: Optional[int],
+        transport_errors: Tuple[Type[BaseException], ...] = ()
+    ) -> bool:
+        if method.upper() not in self.methods:
+            return False
+        if status is not None:
+            return status in self.statuses
+        return isinstance(exc, self.exceptions if self.exceptions is not None else transport_errors)
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before the attempt after `attempt`, None to give up"""
+        if attempt >= self.max_attempts:
+            return None
+        if retry_after is not None and self.respect_retry_after:
+            return retry_after if retry_after <= self.backoff_max else None
+        return self.backoff(attempt)
+
+
+def response_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    return parse_retry_after(headers.get("Retry-After")) if headers else None
+
+
+class HedgeTracker:
+    """
+    Hedging state of one endpoint: when to send the hedged request, and how often it fired and won.
+
+    `delay` is a number of seconds, or an observed percentile of the endpoint latency
+    such as "p95"; a percentile needs `min_samples` latencies before hedging starts,
+    and is recomputed every `refresh_every` latencies rather than on each call.
+    """
+
+    def __init__(
+        self, delay: Union[float, str], window: int = 1000, min_samples: int = 20, refresh_every: int = 50
+    ):
+        self.percentile = None
+        self.fixed_delay = None
+        if isinstance(delay, str):
+            if not (delay.startswith("p") and delay[1:].replace(".", "", 1).isdigit()):
+                raise ValueError(f"hedge delay must be seconds or a percentile like 'p95', got {delay!r}")
+            self.percentile = float(delay[1:]) / 100
+        else:
+            self.fixed_delay = float(delay)
+        self.min_samples = min_samples
+        self.refresh_every = max(1, refresh_every)
+        self._latencies: Deque[float] = deque(maxlen=window)
+        # percentile of the window, and the latencies observed since it was computed
+        self._percentile_delay: Optional[float] = None
+        self._unsorted = 0
+        self.fired = 0
+        self.won = 0
+
+    def observe(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+        self._unsorted += 1
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait for the first request before hedging, None to not hedge"""
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        if len(self._latencies) < self.min_samples:
+            return None
+        if self._percentile_delay is None or self._unsorted >= self.refresh_every:
+            ordered = sorted(self._latencies)
+            self._percentile_delay = ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+            self._unsorted = 0
+        return self._percentile_delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {"fired": self.fired, "won": self.won, "delay": self.delay()}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the upstream while a circuit breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit breaker {name!r} is open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker over the last `window_size` calls.
+
+    The circuit opens when, out of at least `min_calls` calls, the failure rate reaches
+    `failure_rate` or the rate of calls slower than `slow_call_duration` seconds reaches
+    `slow_call_rate`. While open, calls fail fast with `CircuitOpenError`; after
+    `open_duration` seconds up to `half_open_calls` probes are let through, closing the
+    circuit when all of them succeed and reopening it on the first failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_calls: int = 20,
+        window_size: int = 100,
+        slow_call_duration: Optional[float] = None,
+        slow_call_rate: float = 1.0,
+        open_duration: float = 30,
+        half_open_calls: int = 1,
+        name: str = "",
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_size = window_size
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (failed, slow) of the last calls
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    def clone(self, name: str) -> "CircuitBreaker":
+        """A new breaker in the closed state with the same settings"""
+        return type(self)(
+            failure_rate=self.failure_rate,
+            min_calls=self.min_calls,
+            window_size=self.window_size,
+            slow_call_duration=self.slow_call_duration,
+            slow_call_rate=self.slow_call_rate,
+            open_duration=self.open_duration,
+            half_open_calls=self.half_open_calls,
+            name=name,
+            clock=self._clock
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.open_duration:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> None:
+        """Reserve a call, raise `CircuitOpenError` when the circuit is open"""
+        with self._lock:
+            if self._state == self.OPEN:
+                retry_in = self._opened_at + self.open_duration - self._clock()
+                if retry_in > 0:
+                    raise CircuitOpenError(self.name, retry_in)
+                self._state = self.HALF_OPEN
+                self._probes = self._probe_successes = 0
+            if self._state == self.HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    raise CircuitOpenError(self.name, 0)
+                self._probes += 1
+
+    def record(self, duration: float, failed: Optional[bool]) -> None:
+        """
+        Record the outcome of an allowed call; `failed` is None for calls that
+        say nothing about the upstream health, e.g. cancelled ones.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if failed is None:
+                    self._probes -= 1
+                elif failed:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._state = self.CLOSED
+                        self._calls.clear()
+                return
+            if failed is None or self._state != self.CLOSED:
+                return
+            slow = self.slow_call_duration is not None and duration >= self.slow_call_duration
+            self._calls.append((failed, slow))
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for call_failed, _ in self._calls if call_failed)
+            slow_calls = sum(1 for _, call_slow in self._calls if call_slow)
+            if failures / total >= self.failure_rate or (
+                self.slow_call_duration is not None and slow_calls / total >= self.slow_call_rate
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._calls.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._calls)
+            failures = sum(1 for failed, _ in self._calls if failed)
+        return {"state": self.state, "calls": calls, "failures": failures}
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `burst` requests.
+
+    Callers reserve a token and wait until it is available, so a queue of callers is
+    released at `rate`; an async caller cancelled while waiting returns its token. With `respect_retry_after`, a 429 response carrying `Retry-After`
+    empties the bucket for that long.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        respect_retry_after: bool = True,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.respect_retry_after = respect_retry_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token, return the seconds to wait before using it"""
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # a cancelled waiter (e.g. a `wait_for` timeout) gives its token back
+                with self._lock:
+                    self._tokens += 1
+                raise
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no token for the next `seconds`"""
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(self._clock())
+            return {"rate": self.rate, "burst": self.burst, "tokens": self._tokens}
@@ -1,3 +1,4 @@
+import json
 from typing import Dict, Optional, Any
 from pydantic import BaseModel, Field
 
@@ -12,3 +13,78 @@ class RequestInfo(BaseModel):
     response_model: Optional[Any] = None
     function_name: Optional[str] = None
     response_extract_path: Optional[str] = None
+
+
+class ClientRequest:
+    """
+    Lightweight request built by the decorators on every call.
+
+    Holds the same fields as `RequestInfo` without pydantic validation,
+    the data is produced by the client itself. Use `to_request_info()`
+    when a validated `RequestInfo` is needed.
+
+    `content` holds a json body already encoded to bytes (pydantic model bodies),
+    `json_data` decodes it on access for code that expects a dict.
+
+    `status`, `request_size` and `response_size` are filled in by the backends
+    for the endpoint metrics.
+    """
+    __slots__ = (
+        "method", "path", "params", "_json_data", "data", "headers",
+        "response_model", "function_name", "response_extract_path", "content",
+        "status", "request_size", "response_size"
+    )
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        response_model: Optional[Any] = None,
+        function_name: Optional[str] = None,
+        response_extract_path: Optional[str] = None,
+        content: Optional[bytes] = None
+    ):
+        self.method = method
+        self.path = path
+        self.params = {} if params is None else params
+        self._json_data = json_data
+        self.data = data
+        self.headers = headers
+        self.response_model = response_model
+        self.function_name = function_name
+        self.response_extract_path = response_extract_path
+        self.content = content
+        self.status: Optional[int] = None
+        self.request_size: Optional[int] = None
+        self.response_size: Optional[int] = None
+
+    @property
+    def json_data(self) -> Optional[Dict[str, Any]]:
+        if self._json_data is None and self.content is not None:
+            self._json_data = json.loads(self.content)
+        return self._json_data
+
+    @json_data.setter
+    def json_data(self, value: Optional[Dict[str, Any]]) -> None:
+        self._json_data = value
+        self.content = None
+
+    def to_request_info(self) -> RequestInfo:
+        return RequestInfo(
+            method=self.method,
+            path=self.path,
+            params=self.params,
+            json=self.json_data,
+            data=self.data,
+            headers=self.headers,
+            response_model=self.response_model,
+            function_name=self.function_name,
+            response_extract_path=self.response_extract_path
+        )
+
+    def __repr__(self) -> str:
+        return f"ClientRequest(method={self.method!r}, path={self.path!r}, function_name={self.function_name!r})"
@@ -1,10 +1,18 @@
+import contextvars
 import logging
-from typing import Any, Dict, Optional, TypeVar
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar, Union
 
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from pydantic import BaseModel
 
-from .base import BaseWebClient, RequestInfo
+from .base import BaseWebClient, ClientRequest, RequestInfo, _invoke
+from .cache import HttpCache
+from .codec import JsonCodec
+from .tracing import phase
 
 logger = logging.getLogger(__name__)
 
@@ -12,31 +20,202 @@ T = TypeVar('T', bound=BaseModel)
 
 
 class RequestsWebClient(BaseWebClient):
+    _config_options = ("pool_connections", "pool_maxsize", "pool_block", "max_workers")
+    _transport_errors = (requests.ConnectionError, requests.Timeout)
+
     def __init__(
         self,
         base_url: str,
         headers: Optional[Dict[str, Any]] = None,
         timeout: Optional[int] =30,
         session: Optional[requests.Session] = None,
-        statsd_address: Optional[str] = None
+        statsd_address: Optional[str] = None,
+        json_codec: Union[str, JsonCodec] = "json",
+        http_cache: Union[bool, Dict[str, Any], HttpCache, None] = None,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        pool_block: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+        **kwargs
     ):
-        super().__init__(base_url, headers, timeout, session, statsd_address)
-        if not self.session:
+        """
+        Args:
+            session: a `requests.Session` to use, it is not closed by `close()`
+            pool_connections: number of per-host pools kept by the adapter
+            pool_maxsize: connections kept per host, size it to the number of threads sharing the client
+            pool_block: wait for a free connection instead of opening a throwaway one when the pool is full
+            max_workers: threads used by `submit`/`map`, defaults to `pool_maxsize`
+            kwargs: retry and resilience options of `BaseWebClient`
+
+        The owned session always mounts a tuned `HTTPAdapter` (requests defaults: 10, 10, False);
+        a supplied session is only re-mounted when a pool option is given.
+        """
+        super().__init__(base_url, headers, timeout, session, statsd_address, json_codec, http_cache, **kwargs)
+        self._owns_session = self.session is None
+        if self._owns_session:
             self.session = requests.Session()
 
-    def _request(self, request_info: RequestInfo) -> Any:
+        pool_options = (pool_connections, pool_maxsize, pool_block)
+        if self._owns_session or any(option is not None for option in pool_options):
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections or DEFAULT_POOLSIZE,
+                pool_maxsize=pool_maxsize or DEFAULT_POOLSIZE,
+                pool_block=bool(pool_block),
+                max_retries=0
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+        self.max_workers = max_workers or pool_maxsize or DEFAULT_POOLSIZE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Connection pool usage per upstream, e.g.
+
+        {"https://api.example.com:443": {"maxsize": 10, "in_use": 10, "available": 0,
+                                         "connections_created": 14, "requests": 1520}}
+
+        `in_use == maxsize` means the pool is saturated: further threads block (pool_block=True)
+        or open connections that are discarded after use.
+        """
+        stats = {}
+        for adapter in set(self.session.adapters.values()):
+            poolmanager = getattr(adapter, "poolmanager", None)
+            if poolmanager is None:
+                continue
+            for key in poolmanager.pools.keys():
+                pool = poolmanager.pools.get(key)
+                # closed pools drop their queue
+                if pool is None or pool.pool is None:
+                    continue
+                available = pool.pool.qsize()
+                stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                    "maxsize": pool.pool.maxsize,
+                    "in_use": pool.pool.maxsize - available,
+                    "available": available,
+                    "connections_created": pool.num_connections,
+                    "requests": pool.num_requests
+                }
+        return stats
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="pydantic-client"
+                    )
+        return self._executor
+
+    def submit(self, method: Union[str, Callable], *args, **kwargs) -> Future:
+        """
+        Run a decorated method on the client thread pool, the shared session is reused.
+
+        ```python
+        future = client.submit(client.get_user, user_id=1)
+        user = future.result()
+        ```
+        """
+        call = getattr(self, method) if isinstance(method, str) else method
+        # the call runs in the context of the caller, e.g. below its current span
+        return self._get_executor().submit(contextvars.copy_context().run, call, *args, **kwargs)
+
+    def map(
+        self,
+        method: Union[str, Callable],
+        items: Iterable[Any],
+        max_workers: Optional[int] = None,
+        return_exceptions: bool = True
+    ) -> List[Any]:
+        """
+        Call `method` once per item on the client thread pool, results are returned in the order of `items`.
+
+        ```python
+        users = client.map(client.get_user, [{"user_id": 1}, {"user_id": 2}])
+        users = client.map("get_user", [1, 2], max_workers=8)
+        ```
+
+        `max_workers` lowers the number of calls in flight below the pool size for this call.
+        A failing call does not stop the others: its exception is put in place of the result,
+        or raised once all calls finished when `return_exceptions` is False.
+        """
+        call = getattr(self, method) if isinstance(method, str) else method
+        executor = self._get_executor()
+        slots = threading.BoundedSemaphore(max_workers) if max_workers else None
+
+        futures = []
+        for item in items:
+            if slots is not None:
+                slots.acquire()
+            future = executor.submit(contextvars.copy_context().run, _invoke, call, item)
+            if slots is not None:
+                future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+
+        results = [future.exception() or future.result() for future in futures]
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+        return results
+
+    def close(self) -> None:
+        self.flush_metrics()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _error_response(self, exc: BaseException) -> Tuple[Optional[int], Optional[Mapping[str, str]]]:
+        response = getattr(exc, "response", None) if isinstance(exc, requests.HTTPError) else None
+        if response is None:
+            return None, None
+        return response.status_code, response.headers
+
+    def _request(self, request_info: Union[ClientRequest, RequestInfo]) -> Any:
         # Check if there's a mock response for this method
         mock_response = self._get_mock_response(request_info)
         if mock_response is not None:
             return mock_response
 
-        request_params = self.dump_request_params(request_info)
-        response_model = request_params.pop("response_model")
-        extract_path = request_params.pop("response_extract_path", None)
+        with phase("serialize"):
+            request_params = self.dump_request_params(request_info)
+            response_model = request_params.pop("response_model")
+            extract_path = request_params.pop("response_extract_path", None)
 
-        request_params = self.before_request(request_params)
+            with self._timed_phase(request_info.function_name, "before_request"):
+                request_params = self.before_request(request_params)
+            request_params = self._encode_json_body(request_params)
 
-        response = self.session.request(**request_params, timeout=self.timeout)
+        cache_key, cached, fresh = self._http_cache_lookup(request_info, request_params)
+        if fresh:
+            return cached.value
+
+        with phase("network"):
+            start = time.perf_counter()
+            response = self.session.request(**request_params, timeout=self.timeout)
+        if self._phase_listeners:
+            # `elapsed` runs from sending the request to parsing the headers, the body is read after it
+            self._report_transfer(
+                request_info.function_name, start, None,
+                start + response.elapsed.total_seconds(), time.perf_counter()
+            )
+        self._note_response(request_info, request_params, response.status_code)
+        if cached is not None and response.status_code == 304:
+            return self.http_cache.revalidated(cached, response.headers)
         response.raise_for_status()
-        
-        return self._cast_response_to_response_model(response.content, request_info)
+
+        self._note_response_body(request_info, response.content)
+        with phase("parse"), self._timed_phase(request_info.function_name, "validate"):
+            result = self._cast_response_to_response_model(response.content, request_info)
+        self._http_cache_store(cache_key, request_params, response.status_code, response.headers, result)
+        return result
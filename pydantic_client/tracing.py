@@ -0,0 +1,175 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# listener(function_name, phase, seconds) of `BaseWebClient.add_phase_listener`
+PhaseListener = Callable[[str, str, float], None]
+
+# innermost open span of the running task / thread
+_current_span: ContextVar[Optional["Span"]] = ContextVar("pydantic_client_span", default=None)
+
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+
+class Span:
+    """
+    One timed block of a span tree. The spans opened by concurrent tasks below the
+    same parent are all its children, each task tracks its own current span.
+    """
+    __slots__ = ("name", "parent", "children", "start", "end", "attributes")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, start: Optional[float] = None):
+        self.name = name
+        self.parent = parent
+        self.children: List[Span] = []
+        self.start = time.perf_counter() if start is None else start
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = {}
+        if parent is not None:
+            parent.children.append(self)
+
+    def finish(self, end: Optional[float] = None) -> None:
+        self.end = time.perf_counter() if end is None else end
+
+    def child(self, name: str, start: float, end: float) -> "Span":
+        """Add an already finished child, e.g. a phase of a call"""
+        span = Span(name, self, start)
+        span.end = end
+        return span
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end is None else 1000 * (self.end - self.start)
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """The span tree as plain data, start offsets are in ms from the root span start"""
+        origin = self.start if origin is None else origin
+        return {
+            "name": self.name,
+            "start_ms": 1000 * (self.start - origin),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "children": [child.to_dict(origin) for child in self.children],
+        }
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, duration_ms={self.duration_ms}, children={len(self.children)})"
+
+
+class _Phase:
+    """Times a block as a child of the current span"""
+    __slots__ = ("parent", "name", "start")
+
+    def __init__(self, parent: Span, name: str):
+        self.parent = parent
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.parent.child(self.name, self.start, time.perf_counter())
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+_NO_PHASE = _NoPhase()
+
+
+def emit_phase(listeners: Tuple[PhaseListener, ...], function_name: str, name: str, seconds: float) -> None:
+    for listener in listeners:
+        try:
+            listener(function_name, name, seconds)
+        except Exception:
+            logger.exception(f"[{function_name}] phase listener failed")
+
+
+class _PhaseTimer:
+    """Reports the duration of a block to the phase listeners of a client"""
+    __slots__ = ("listeners", "function_name", "name", "start")
+
+    def __init__(self, listeners: Tuple[PhaseListener, ...], function_name: str, name: str):
+        self.listeners = listeners
+        self.function_name = function_name
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        emit_phase(self.listeners, self.function_name, self.name, time.perf_counter() - self.start)
+
+
+def timed_phase(listeners: Tuple[PhaseListener, ...], function_name: str, name: str):
+    """Context manager reporting `name` to `listeners`, a no-op without listeners"""
+    if not listeners:
+        return _NO_PHASE
+    return _PhaseTimer(listeners, function_name, name)
+
+
+def phase(name: str):
+    """Context manager timing `name` below the current span, a no-op outside of any span"""
+    parent = _current_span.get()
+    if parent is None:
+        return _NO_PHASE
+    return _Phase(parent, name)
+
+
+class SpanContext:
+    """
+    `with client.span("name"):` / `async with client.span("name"):` times a block as a span.
+
+    Spans opened inside it, and the decorated calls made inside it with their build,
+    serialize, network and parse phases, become its children. A finished root span is
+    passed to the `span_exporter` of the client and kept in `client.finished_spans`.
+    """
+
+    def __init__(self, client, prefix: Optional[str] = None):
+        self.client = client
+        self.prefix = prefix or "api"
+        self.span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self):
+        self.span = Span(self.prefix, _current_span.get())
+        self._token = _current_span.set(self.span)
+        logger.debug(f"[{self.prefix}] span start")
+        return self.client
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        span = self.span
+        span.finish()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            span.attributes["error"] = exc_type.__name__
+        elapsed = span.duration_ms
+        logger.debug(f"[{self.prefix}] span end, elapsed: {elapsed}ms")
+        get_metrics = getattr(self.client, "_get_metrics", None)
+        metrics = get_metrics() if get_metrics is not None else None
+        if metrics is not None:
+            metrics.span(self.prefix, elapsed / 1000)
+        if span.parent is None:
+            on_root_span = getattr(self.client, "_on_root_span", None)
+            if on_root_span is not None:
+                on_root_span(span)
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
@@ -0,0 +1,110 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+from pydantic_client import get
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+from pydantic_client.concurrency import AdaptiveConcurrencyLimiter, AIMDLimit, GradientLimit
+
+
+class Item(BaseModel):
+    id: str
+
+
+class LimitedClient(AiohttpWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def test_aimd_limit():
+    aimd = AIMDLimit(backoff_ratio=0.5, timeout=1)
+    assert aimd.update(10, 0.1, inflight=5, dropped=False) == 11
+    assert aimd.update(10, 0.1, inflight=2, dropped=False) == 10
+    assert aimd.update(10, 0.1, inflight=5, dropped=True) == 5
+    assert aimd.update(10, 2, inflight=5, dropped=False) == 5
+
+
+def test_gradient_limit_follows_latency():
+    gradient = GradientLimit()
+    limit = 20.0
+    for _ in range(50):
+        limit = gradient.update(limit, 0.01, inflight=int(limit), dropped=False)
+    grown = limit
+    assert grown > 20
+    for _ in range(50):
+        limit = gradient.update(limit, 0.1, inflight=int(limit), dropped=False)
+    assert limit < grown
+
+
+def test_gradient_limit_zero_rtt():
+    gradient = GradientLimit()
+    limit = gradient.update(10, 0.0, 10, False)
+    assert limit > 0
+    assert gradient.update(limit, 0.0, 10, False) > 0
+
+
+async def test_limiter_queues_and_cancels():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    await limiter.acquire()
+    first = asyncio.ensure_future(limiter.acquire())
+    second = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats() == {"limit": 1, "inflight": 1, "queued": 2}
+
+    first.cancel()
+    await asyncio.sleep(0)
+    limiter.release()
+    await second
+    assert limiter.stats() == {"limit": 1, "inflight": 1, "queued": 0}
+    limiter.release()
+
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter("bbr")
+
+
+async def test_client_limits_inflight_requests():
+    inflight = 0
+    peak = 0
+
+    class Client(LimitedClient):
+        async def _request(self, request_info):
+            nonlocal inflight, peak
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.01)
+            inflight -= 1
+            return Item(id="1")
+
+    statsd = MagicMock()
+    client = Client(
+        base_url="http://example.com",
+        concurrency_limit={"algorithm": AIMDLimit(), "initial_limit": 3, "max_limit": 4}
+    )
+    client._statsd_client = statsd
+    await asyncio.gather(*(client.get_item(str(i)) for i in range(20)))
+
+    assert 3 <= peak <= 4
+    assert client.concurrency_stats() == {"limit": 4, "inflight": 0, "queued": 0}
+    statsd.gauge.assert_any_call("Client.concurrency.limit", 4)
+    statsd.gauge.assert_any_call("Client.concurrency.queued", 15)
+
+
+async def test_client_backs_off_on_errors():
+    class Client(LimitedClient):
+        async def _request(self, request_info):
+            raise asyncio.TimeoutError()
+
+    client = Client(base_url="http://example.com", concurrency_limit={"initial_limit": 10})
+    for _ in range(3):
+        with pytest.raises(asyncio.TimeoutError):
+            await client.get_item("1")
+    assert client.concurrency_stats()["limit"] == int(10 * 0.9 ** 3)
+
+
+def test_from_config():
+    client = HttpxWebClient.from_config({"base_url": "http://example.com", "concurrency_limit": "gradient"})
+    assert isinstance(client.concurrency_limiter.algorithm, GradientLimit)
+    assert LimitedClient(base_url="http://example.com").concurrency_stats() is None
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from pydantic_client import get
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+
+
+class User(BaseModel):
+    id: str
+    name: str
+    email: str
+
+
+class SlowClient(AiohttpWebClient):
+    def __init__(self, **kwargs):
+        super().__init__(base_url="http://example.com", **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _request(self, request_info):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            user_id = request_info.path.rsplit("/", 1)[-1]
+            await asyncio.sleep(0.01 if user_id != "0" else 0.05)
+            if user_id == "bad":
+                raise ValueError("bad user")
+            return user_id
+        finally:
+            self.in_flight -= 1
+
+    @get("/users/{user_id}")
+    async def get_user(self, user_id: str) -> User:
+        ...
+
+
+class TestHttpxClient(HttpxWebClient):
+    @get("/users/{user_id}")
+    async def get_user(self, user_id: str) -> User:
+        ...
+
+
+@pytest.mark.asyncio
+async def test_map_keeps_order_and_bounds_concurrency():
+    client = SlowClient()
+    items = [{"user_id": str(i)} for i in range(10)]
+    results = await client.map(client.get_user, items, concurrency=3)
+    assert results == [str(i) for i in range(10)]
+    assert client.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_map_default_concurrency_is_pool_size():
+    client = SlowClient(limit=4)
+    await client.map("get_user", [str(i) for i in range(10)])
+    assert client.max_in_flight == 4
+
+
+@pytest.mark.asyncio
+async def test_map_collects_exceptions():
+    client = SlowClient()
+    results = await client.map("get_user", ["1", "bad", ("2",)])
+    assert results[0] == "1"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == "2"
+
+    with pytest.raises(ValueError):
+        await client.map("get_user", ["1", "bad"], return_exceptions=False)
+
+
+@pytest.mark.asyncio
+async def test_map_as_completed():
+    client = SlowClient()
+    seen = []
+    async for index, result in client.map_as_completed("get_user", ["0", "1", "bad"], concurrency=3):
+        seen.append((index, result))
+
+    assert seen[-1] == (0, "0")
+    assert sorted(index for index, _ in seen) == [0, 1, 2]
+    assert isinstance(dict(seen)[2], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_map_over_http(mock_server, base_url):
+    async with TestHttpxClient(base_url=base_url) as client:
+        users = await client.map(client.get_user, ["1", "2", "3"], concurrency=2)
+    assert [user.id for user in users] == ["1", "2", "3"]
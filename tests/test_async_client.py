@@ -142,3 +142,105 @@ async def test_aiohttp_get_dict_request(mock_server, base_url):
 
     assert isinstance(response, dict)
     assert response == {"users": []}
+
+
+@pytest.mark.asyncio
+async def test_httpx_reuses_pooled_client(mock_server, base_url):
+    async with TestHttpxClient(base_url=base_url, max_connections=5, keepalive_expiry=10) as client:
+        await client.get_user("1")
+        session = client.session
+        await client.get_user("2")
+        assert client.session is session
+        assert client.limits.max_connections == 5
+    assert session.is_closed
+    assert client.session is None
+
+
+@pytest.mark.asyncio
+async def test_httpx_external_session_not_closed(mock_server, base_url):
+    import httpx
+
+    session = httpx.AsyncClient()
+    client = TestHttpxClient(base_url=base_url, session=session)
+    response = await client.get_user("1")
+    assert response.id == "1"
+    await client.aclose()
+    assert not session.is_closed
+    await session.aclose()
+
+
+def test_httpx_from_config():
+    client = TestHttpxClient.from_config({
+        "base_url": "http://example.com",
+        "max_connections": 7,
+        "max_keepalive_connections": 3,
+        "http2": True
+    })
+    assert client.limits.max_connections == 7
+    assert client.limits.max_keepalive_connections == 3
+    assert client.http2
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_pool_config_and_close(mock_server, base_url):
+    async with TestAiohttpClient(base_url=base_url, timeout=5, limit=10, limit_per_host=2) as client:
+        await client.get_user("1")
+        session = client.session
+        await client.get_user("2")
+        assert client.session is session
+        assert session.connector.limit == 10
+        assert session.connector.limit_per_host == 2
+        assert session.timeout.total == 5
+    assert session.closed
+    assert client.session is None
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_external_session_not_closed(mock_server, base_url):
+    import aiohttp
+
+    session = aiohttp.ClientSession()
+    client = TestAiohttpClient(base_url=base_url, session=session)
+    response = await client.get_user("1")
+    assert response.id == "1"
+    await client.close()
+    assert not session.closed
+    await session.close()
+
+
+def test_aiohttp_from_config():
+    client = TestAiohttpClient.from_config({
+        "base_url": "http://example.com",
+        "timeout": 3,
+        "limit": 50,
+        "limit_per_host": 5,
+        "keepalive_timeout": 30,
+        "ttl_dns_cache": 60
+    })
+    assert client.limit == 50
+    assert client.limit_per_host == 5
+    assert client.keepalive_timeout == 30
+    assert client.ttl_dns_cache == 60
+    assert client.client_timeout.total == 3
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_pool_stats(mock_server, base_url):
+    async with TestAiohttpClient(base_url=base_url, limit=10, limit_per_host=4) as client:
+        assert client.pool_stats() == {}
+        await client.get_user("1")
+        stats = client.pool_stats()
+        assert len(stats) == 1
+        assert list(stats.values())[0] == {"maxsize": 4, "in_use": 0, "available": 1}
+    assert client.pool_stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_httpx_pool_stats(mock_server, base_url):
+    async with TestHttpxClient(base_url=base_url, max_connections=5) as client:
+        assert client.pool_stats() == {}
+        await client.get_user("1")
+        stats = client.pool_stats()
+        assert len(stats) == 1
+        assert list(stats.values())[0] == {"maxsize": 5, "in_use": 0, "available": 1}
+    assert client.pool_stats() == {}
@@ -1,5 +1,5 @@
 from pydantic_client.base import BaseWebClient, SpanContext
-from pydantic_client.schema import RequestInfo
+from pydantic_client.schema import ClientRequest, RequestInfo
 from pydantic_client.tools.agno import register_agno_tool
 
 
@@ -25,7 +25,7 @@ class TestClient(BaseWebClient):
 
 def test_span_context_logs(monkeypatch):
     logs = []
-    monkeypatch.setattr('logging.Logger.info', lambda self, msg: logs.append(msg))
+    monkeypatch.setattr('logging.Logger.debug', lambda self, msg: logs.append(msg))
     class DummyClient:
         _statsd_client = None
     with SpanContext(DummyClient(), prefix="foo") as c:
@@ -55,6 +55,27 @@ def test_dump_request_params_merges_headers():
     assert out["url"] == "http://a/x"
 
 
+def test_dump_request_params_client_request():
+    client = TestClient(base_url="http://a", headers={"A": "B"})
+    req = ClientRequest("POST", "/x", params={"q": 1}, json_data={"k": "v"}, function_name="f")
+    out = client.dump_request_params(req)
+    assert out["headers"] == {"A": "B"}
+    assert out["url"] == "http://a/x"
+    assert out["params"] == {"q": 1}
+    assert out["json"] == {"k": "v"}
+    assert out["data"] is None
+    assert "function_name" not in out
+
+
+def test_client_request_to_request_info():
+    req = ClientRequest("POST", "/x", json_data={"k": "v"}, function_name="f")
+    info = req.to_request_info()
+    assert isinstance(info, RequestInfo)
+    assert info.json_data == {"k": "v"}
+    assert info.params == {}
+    assert info.function_name == "f"
+
+
 def test_register_agno_tools_and_get_agno_tools():
     client = TestClient(base_url="http://a")
     agent = DummyAgent()
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+import requests_mock
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get, post
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+from pydantic_client.concurrency import AsyncBatchLoader
+
+
+class Item(BaseModel):
+    id: str
+    name: str
+
+
+class AiohttpItemClient(AiohttpWebClient):
+    @get("/items/{item_id}", batch_with="batch_get_items", batch_result_key="id")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+    @post("/items:batchGet")
+    async def batch_get_items(self, ids: list) -> list[Item]:
+        ...
+
+
+class HttpxItemClient(HttpxWebClient):
+    @get("/items/{item_id}", batch_with="batch_get_items", batch_result_key="id", batch_max_size=2)
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+    @post("/items:batchGet")
+    async def batch_get_items(self, ids: list) -> list[Item]:
+        ...
+
+
+class SyncItemClient(RequestsWebClient):
+    @get("/items/{item_id}", batch_with="batch_get_items", batch_result_key="id")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+
+@pytest.fixture
+async def items_server(aiohttp_client):
+    bulk_calls = []
+
+    async def batch_get(request):
+        ids = (await request.json())["ids"]
+        bulk_calls.append(ids)
+        return web.json_response([{"id": i, "name": f"item {i}"} for i in ids if i != "missing"])
+
+    app = web.Application()
+    app.router.add_post("/items:batchGet", batch_get)
+    server = await aiohttp_client(app)
+    yield str(server.make_url("")).rstrip("/"), bulk_calls
+
+
+@pytest.mark.asyncio
+async def test_calls_in_same_tick_are_batched(items_server):
+    url, bulk_calls = items_server
+    async with AiohttpItemClient(base_url=url) as client:
+        items = await asyncio.gather(
+            client.get_item("1"), client.get_item(item_id="2"), client.get_item("1"), client.get_item("missing")
+        )
+
+    assert [item.id if item else None for item in items] == ["1", "2", "1", None]
+    assert bulk_calls == [["1", "2", "missing"]]
+
+
+@pytest.mark.asyncio
+async def test_batches_split_at_max_size(items_server):
+    url, bulk_calls = items_server
+    async with HttpxItemClient(base_url=url) as client:
+        items = await asyncio.gather(*(client.get_item(str(i)) for i in range(5)))
+
+    assert [item.id for item in items] == ["0", "1", "2", "3", "4"]
+    assert bulk_calls == [["0", "1"], ["2", "3"], ["4"]]
+
+
+@pytest.mark.asyncio
+async def test_loader_window_and_errors():
+    calls = []
+
+    async def load_many(keys):
+        calls.append(keys)
+        if "bad" in keys:
+            raise ValueError("bulk failed")
+        return {key: key.upper() for key in keys}
+
+    loader = AsyncBatchLoader(load_many, key_of=lambda item: item, window=0.01)
+
+    async def late(key):
+        await asyncio.sleep(0.001)
+        return await loader.load(key)
+
+    assert await asyncio.gather(loader.load("a"), late("b")) == ["A", "B"]
+    assert calls == [["a", "b"]]
+
+    results = await asyncio.gather(loader.load("c"), loader.load("bad"), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_sync_client_sends_single_requests():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1", "name": "item 1"})
+        client = SyncItemClient(base_url="http://example.com")
+        assert client.get_item("1").name == "item 1"
+
+
+@pytest.mark.parametrize("batch_key", [None, "other"])
+def test_batched_endpoint_takes_only_its_key(batch_key):
+    with pytest.raises(ValueError, match="exactly one argument"):
+        @get("/items/{item_id}", batch_with="batch_get_items", batch_key=batch_key)
+        async def get_item(self, item_id: str, request_headers: dict = None) -> Item:
+            ...
+
+    with pytest.raises(ValueError, match="exactly one argument"):
+        @get("/items", batch_with="batch_get_items")
+        async def list_items(self) -> Item:
+            ...
+
+
+@pytest.mark.asyncio
+async def test_batched_calls_are_measured_and_traced(items_server):
+    url, bulk_calls = items_server
+    async with AiohttpItemClient(base_url=url) as client:
+        async with client.span("handler"):
+            await asyncio.gather(client.get_item("1"), client.get_item("2"))
+
+    assert client.stats()["get_item"]["count"] == 2
+    assert client.stats()["batch_get_items"]["count"] == 1
+    root = client.finished_spans[0]
+    assert [child.name for child in root.children].count("AiohttpItemClient.get_item") == 2
+
+
+@pytest.mark.asyncio
+async def test_loader_keeps_running_batches():
+    release = asyncio.Event()
+
+    async def load_many(keys):
+        await release.wait()
+        return {key: key for key in keys}
+
+    loader = AsyncBatchLoader(load_many, key_of=lambda item: item)
+    pending = asyncio.ensure_future(loader.load("a"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert len(loader._tasks) == 1
+    release.set()
+    assert await pending == "a"
+    await asyncio.sleep(0)
+    assert len(loader._tasks) == 0
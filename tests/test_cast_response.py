@@ -1,10 +1,9 @@
-from json import JSONDecodeError
-from typing import Optional, Any
+from typing import Optional, Any, Union
 
 from pydantic import BaseModel, ValidationError
 
 from pydantic_client import RequestsWebClient, get
-from pydantic_client.base import PydanticClientValidationError
+from pydantic_client.base import get_type_adapter
 
 
 class User(BaseModel):
@@ -25,6 +24,14 @@ class TestClient(RequestsWebClient):
     def too_complex_return_type(self) -> list[dict[str, Any]]:
         ...
 
+    @get("/users_by_name")
+    def users_by_name(self) -> dict[str, User]:
+        ...
+
+    @get("/user_or_users")
+    def user_or_users(self) -> Union[User, list[User]]:
+        ...
+
     @get("/just_bytes")
     def just_bytes(self) -> bytes:
         ...
@@ -97,8 +104,8 @@ def test_return_primitive_types():
 
     try:
         client.list_of_some_neg()
-        assert False, 'must be json decoding error'
-    except JSONDecodeError:
+        assert False, 'must be json validation error'
+    except ValidationError:
         pass
 
 
@@ -152,7 +159,7 @@ def test_generic_types():
     except ValidationError:
         pass
 
-def test_incorrect_return_type():
+def test_nested_generic_return_types():
     client = TestClient(base_url="https://example.com")
 
     mock_data = [
@@ -163,13 +170,29 @@ def test_incorrect_return_type():
                 {"name": "test2", "age": 25, "email": "test2@example.com"}
             ]
         },
+        {
+            "name": "users_by_name",
+            "output": {"test1": {"name": "test1", "age": 30}}
+        },
+        {
+            "name": "user_or_users",
+            "output": [{"name": "test1", "age": 30}]
+        },
     ]
 
     client.set_mock_config(mock_config=mock_data)
 
-    try:
-        client.too_complex_return_type()
-        assert False, 'must be raises exception PydanticClientValidationError'
-    except PydanticClientValidationError as e:
-        pass
+    data = client.too_complex_return_type()
+    assert data[0] == {"name": "test1", "age": 30, "email": "test1@example.com"}
+
+    data = client.users_by_name()
+    assert isinstance(data["test1"], User)
+
+    data = client.user_or_users()
+    assert isinstance(data, list)
+    assert isinstance(data[0], User)
+
 
+def test_type_adapter_cached():
+    assert get_type_adapter(list[User]) is get_type_adapter(list[User])
+    assert get_type_adapter(object()) is None
@@ -0,0 +1,161 @@
+import pytest
+import requests
+import requests_mock
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient
+from pydantic_client.resilience import CircuitBreaker, CircuitOpenError
+
+
+class Item(BaseModel):
+    id: str
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BreakerClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+    @get("/other/{item_id}")
+    def get_other(self, item_id: str) -> Item:
+        ...
+
+    @get("/health", circuit_breaker=False)
+    def health(self) -> dict:
+        ...
+
+
+class AiohttpBreakerClient(AiohttpWebClient):
+    @get("/items/{item_id}", circuit_breaker=CircuitBreaker(min_calls=2, failure_rate=1))
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def test_breaker_state_machine():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=4, failure_rate=0.5, open_duration=10, half_open_calls=2, clock=clock)
+
+    for failed in (False, True, False):
+        breaker.allow()
+        breaker.record(0.1, failed)
+    assert breaker.state == "closed"
+    breaker.allow()
+    breaker.record(0.1, True)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.allow()
+    assert exc_info.value.retry_in == 10
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    breaker.allow()
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record(0.1, False)
+    breaker.record(0.1, None)  # cancelled probe frees its slot
+    breaker.allow()
+    breaker.record(0.1, False)
+    assert breaker.state == "closed"
+
+    # a failed probe reopens the circuit
+    for _ in range(4):
+        breaker.allow()
+        breaker.record(0.1, True)
+    clock.now = 25
+    breaker.allow()
+    breaker.record(0.1, True)
+    assert breaker.state == "open"
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker(min_calls=3, slow_call_duration=1, slow_call_rate=0.5)
+    breaker.record(0.1, False)
+    breaker.record(2, False)
+    assert breaker.state == "closed"
+    breaker.record(3, False)
+    assert breaker.state == "open"
+
+
+def test_sync_client_fails_fast():
+    client = BreakerClient(
+        base_url="http://example.com",
+        circuit_breaker={"min_calls": 3, "failure_rate": 0.5, "open_duration": 60}
+    )
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", status_code=503)
+        m.get("http://example.com/items/404", status_code=404)
+        m.get("http://example.com/other/1", json={"id": "1"})
+        m.get("http://example.com/health", status_code=503)
+
+        # client errors say nothing about the upstream health
+        for _ in range(3):
+            with pytest.raises(requests.HTTPError):
+                client.get_item("404")
+        assert client.circuit_breaker_stats()["get_item"]["state"] == "closed"
+
+        for _ in range(3):
+            with pytest.raises(requests.HTTPError):
+                client.get_item("1")
+        calls = m.call_count
+        with pytest.raises(CircuitOpenError):
+            client.get_item("1")
+        assert m.call_count == calls
+        assert client.circuit_breaker_stats()["get_item"]["state"] == "open"
+
+        # other endpoints have their own circuit
+        assert client.get_other("1") == Item(id="1")
+        for _ in range(5):
+            with pytest.raises(requests.HTTPError):
+                client.health()
+        assert "health" not in client.circuit_breaker_stats()
+
+
+def test_host_scope_and_from_config():
+    client = BreakerClient.from_config({
+        "base_url": "http://example.com:8080",
+        "circuit_breaker": {"min_calls": 2, "failure_rate": 1},
+        "circuit_breaker_scope": "host",
+    })
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com:8080/items/1", exc=requests.ConnectionError)
+        m.get("http://example.com:8080/other/1", exc=requests.ConnectionError)
+        with pytest.raises(requests.ConnectionError):
+            client.get_item("1")
+        with pytest.raises(requests.ConnectionError):
+            client.get_other("1")
+        with pytest.raises(CircuitOpenError):
+            client.get_other("1")
+    assert list(client.circuit_breaker_stats()) == ["example.com:8080"]
+
+    with pytest.raises(ValueError):
+        BreakerClient(base_url="http://example.com", circuit_breaker_scope="global")
+
+
+async def test_async_endpoint_breaker(aiohttp_client):
+    async def handler(request):
+        return web.json_response({"error": "down"}, status=500)
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", handler)
+    server = await aiohttp_client(app)
+    client = AiohttpBreakerClient(base_url=str(server.make_url("")).rstrip("/"))
+
+    for _ in range(2):
+        with pytest.raises(Exception) as exc_info:
+            await client.get_item("1")
+        assert not isinstance(exc_info.value, CircuitOpenError)
+    with pytest.raises(CircuitOpenError):
+        await client.get_item("1")
+    await client.aclose()
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient
+from pydantic_client.concurrency import AsyncSingleFlight, SingleFlight
+
+
+class CountingAsyncClient(AiohttpWebClient):
+    def __init__(self):
+        super().__init__(base_url="http://example.com")
+        self.calls = 0
+
+    async def _request(self, request_info):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        if request_info.path.endswith("bad"):
+            raise ValueError("bad")
+        return {"path": request_info.path}
+
+    @get("/items/{item_id}", coalesce=True)
+    async def get_item(self, item_id: str) -> dict:
+        ...
+
+    @get("/items/{item_id}/plain")
+    async def get_item_plain(self, item_id: str) -> dict:
+        ...
+
+
+class CountingSyncClient(RequestsWebClient):
+    def __init__(self):
+        super().__init__(base_url="http://example.com")
+        self.calls = 0
+
+    def _request(self, request_info):
+        self.calls += 1
+        time.sleep(0.05)
+        return {"path": request_info.path}
+
+    @get("/items/{item_id}", coalesce=True)
+    def get_item(self, item_id: str) -> dict:
+        ...
+
+
+@pytest.mark.asyncio
+async def test_async_identical_calls_share_one_request():
+    client = CountingAsyncClient()
+    results = await asyncio.gather(*(client.get_item("1") for _ in range(10)), client.get_item("2"))
+    assert client.calls == 2
+    assert all(result is results[0] for result in results[:10])
+    assert len(client._async_single_flight) == 0
+
+    await asyncio.gather(*(client.get_item_plain("1") for _ in range(3)))
+    assert client.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_async_followers_receive_exception():
+    client = CountingAsyncClient()
+    results = await asyncio.gather(*(client.get_item("bad") for _ in range(3)), return_exceptions=True)
+    assert client.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_async_cancelled_follower_keeps_leader_running():
+    flight = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 1
+
+    leader = asyncio.ensure_future(flight.do("k", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("k", slow))
+    await asyncio.sleep(0)
+    follower.cancel()
+    assert await leader == 1
+
+
+@pytest.mark.asyncio
+async def test_async_cancelled_leader_keeps_follower_running():
+    flight = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 1
+
+    leader = asyncio.ensure_future(flight.do("k", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("k", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == 1
+    assert leader.cancelled()
+    assert len(flight) == 0
+
+
+def test_sync_identical_calls_share_one_request():
+    client = CountingSyncClient()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_item("1"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == 1
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+
+
+def test_sync_single_flight_propagates_errors():
+    flight = SingleFlight()
+
+    def fail():
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        flight.do("k", fail)
+    assert len(flight) == 0
+    assert flight.do("k", lambda: 2) == 2
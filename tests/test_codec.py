@@ -0,0 +1,122 @@
+import pytest
+import requests_mock
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get, post
+from pydantic_client.async_client import HttpxWebClient
+from pydantic_client.codec import JsonCodec, get_codec
+
+
+class Item(BaseModel):
+    name: str
+
+
+class CountingCodec(JsonCodec):
+    def __init__(self):
+        self.dumps_calls = 0
+        self.loads_calls = 0
+
+    def dumps(self, obj):
+        self.dumps_calls += 1
+        return super().dumps(obj)
+
+    def loads(self, data):
+        self.loads_calls += 1
+        return super().loads(data)
+
+
+class CodecClient(RequestsWebClient):
+    @post("/items")
+    def create_item(self, name: str) -> Item:
+        ...
+
+    @get("/items", response_extract_path="$.data.items[0]")
+    def first_item(self) -> Item:
+        ...
+
+
+class AsyncCodecClient(HttpxWebClient):
+    @post("/echo")
+    async def echo(self, name: str) -> dict:
+        ...
+
+
+def test_get_codec():
+    assert type(get_codec()) is JsonCodec
+    assert type(get_codec("json")) is JsonCodec
+    codec = CountingCodec()
+    assert get_codec(codec) is codec
+    with pytest.raises(ValueError):
+        get_codec("unknown")
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec"])
+def test_optional_codecs(name):
+    pytest.importorskip(name)
+    codec = get_codec(name)
+    assert codec.name == name
+    assert codec.loads(codec.dumps({"a": [1, "b"]})) == {"a": [1, "b"]}
+
+
+def test_codec_used_for_body_and_response():
+    codec = CountingCodec()
+    client = CodecClient(base_url="http://example.com", json_codec=codec)
+    with requests_mock.Mocker() as m:
+        m.post("http://example.com/items", json={"name": "a"})
+        m.get("http://example.com/items", json={"data": {"items": [{"name": "b"}]}})
+
+        assert client.create_item("a") == Item(name="a")
+        assert m.last_request.body == b'{"name": "a"}'
+        assert m.last_request.headers["Content-Type"] == "application/json"
+
+        assert client.first_item() == Item(name="b")
+
+    assert codec.dumps_calls == 1
+    assert codec.loads_calls == 1
+
+
+def test_codec_from_config():
+    pytest.importorskip("orjson")
+    client = CodecClient.from_config({"base_url": "http://example.com", "json_codec": "orjson"})
+    assert client.json_codec.name == "orjson"
+
+
+@pytest.mark.asyncio
+async def test_httpx_sends_encoded_body(mock_server, base_url):
+    async with AsyncCodecClient(base_url=base_url, json_codec=CountingCodec()) as client:
+        assert await client.echo("x") == {"name": "x"}
+        assert client.json_codec.dumps_calls == 1
+
+
+class HookClient(RequestsWebClient):
+    def before_request(self, request_params):
+        request_params["json"] = {**request_params["json"], "name": request_params["json"]["name"].upper()}
+        return request_params
+
+    @post("/items")
+    def create_item(self, item: Item) -> Item:
+        ...
+
+
+class PlainModelClient(RequestsWebClient):
+    @post("/items")
+    def create_item(self, item: Item) -> Item:
+        ...
+
+
+def test_before_request_can_rewrite_model_body():
+    client = HookClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.post("http://example.com/items", json={"name": "A"})
+        client.create_item(Item(name="a"))
+        assert m.last_request.json() == {"name": "A"}
+
+
+def test_model_body_sent_pre_encoded_without_hook():
+    codec = CountingCodec()
+    client = PlainModelClient(base_url="http://example.com", json_codec=codec)
+    with requests_mock.Mocker() as m:
+        m.post("http://example.com/items", json={"name": "a"})
+        client.create_item(Item(name="a"))
+        assert m.last_request.body == b'{"name":"a"}'
+    assert codec.dumps_calls == 0
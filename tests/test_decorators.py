@@ -81,3 +81,37 @@ async def test_async_path_params(mock_server, base_url):
 async def test_async_query_params(mock_server, base_url):
     client = TestAsyncClient(base_url=base_url)
     await client.list_users(page=2, per_page=20)
+
+
+class LaterUser(BaseModel):
+    id: str
+
+
+class ForwardRefClient(RequestsWebClient):
+    @get("/later/{user_id}")
+    def get_later(self, user_id: str) -> "LaterUser":
+        ...
+
+    @get("/items/{a}/x/{b}?q={q}&static=1")
+    def get_item(self, a: int, b: str, q: str = None):
+        ...
+
+
+def test_endpoint_compiled_once(monkeypatch):
+    import inspect
+
+    client = ForwardRefClient(base_url="http://example.com")
+    monkeypatch.setattr(inspect, "signature", lambda *a, **kw: pytest.fail("signature per call"))
+
+    with requests_mock.Mocker() as m:
+        m.get('http://example.com/items/1/x/b', json={})
+        client.get_item(1, "b", q="z")
+        assert m.last_request.qs == {'q': ['z'], 'static': ['1']}
+
+
+def test_string_return_annotation_resolved_in_module_scope():
+    with requests_mock.Mocker() as m:
+        m.get('http://example.com/later/1', json={"id": "1"})
+        client = ForwardRefClient(base_url="http://example.com")
+        response = client.get_later("1")
+        assert isinstance(response, LaterUser)
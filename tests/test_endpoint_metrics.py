@@ -0,0 +1,202 @@
+import time
+
+import pytest
+import requests
+import requests_mock
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get, post
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+from pydantic_client.metrics import StatsdMetrics
+
+
+class Item(BaseModel):
+    id: str
+
+
+class FakeStatsd:
+    """statsd client recording what the pipelines send"""
+
+    def __init__(self):
+        self.sent = []
+        self.packets = 0
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.stats = []
+
+    def timing(self, stat, value):
+        self.stats.append(("timing", stat, value))
+
+    def incr(self, stat, count=1):
+        self.stats.append(("incr", stat, count))
+
+    def gauge(self, stat, value):
+        self.stats.append(("gauge", stat, value))
+
+    def send(self):
+        self.client.sent.extend(self.stats)
+        self.client.packets += 1
+
+
+class MetricsClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+    @post("/items")
+    def create_item(self, item: Item) -> Item:
+        ...
+
+
+class AiohttpMetricsClient(AiohttpWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+class HttpxMetricsClient(HttpxWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def by_name(sent):
+    return {stat: value for _, stat, value in sent}
+
+
+def test_buffer_flushes_by_size_and_interval():
+    now = [0.0]
+    statsd = FakeStatsd()
+    metrics = StatsdMetrics(statsd, flush_interval=1, max_buffer=3, clock=lambda: now[0])
+    metrics.incr("a")
+    metrics.gauge("b", 2)
+    assert statsd.sent == []
+    metrics.timing("c", 1.5)
+    assert statsd.packets == 1
+    assert statsd.sent == [("incr", "a", 1), ("gauge", "b", 2), ("timing", "c", 1.5)]
+
+    metrics.incr("d")
+    now[0] = 2
+    metrics.incr("e")
+    assert statsd.packets == 2
+    metrics.flush()
+    metrics.flush()
+    assert statsd.packets == 2
+
+
+def test_buffer_flushed_by_timer():
+    statsd = FakeStatsd()
+    metrics = StatsdMetrics(statsd, flush_interval=0.05)
+    metrics.incr("a")
+    metrics.incr("b")
+    assert statsd.sent == []
+    deadline = time.monotonic() + 2
+    while not statsd.sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert statsd.sent == [("incr", "a", 1), ("incr", "b", 1)]
+    assert statsd.packets == 1
+    assert metrics._timer is None
+
+
+def test_sync_endpoint_metrics():
+    statsd = FakeStatsd()
+    client = MetricsClient(base_url="http://example.com")
+    client._statsd_client = statsd
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        m.get("http://example.com/items/2", status_code=503)
+        m.post("http://example.com/items", json={"id": "3"})
+        client.get_item("1")
+        with pytest.raises(requests.HTTPError):
+            client.get_item("2")
+        client.create_item(Item(id="3"))
+    assert statsd.sent == []
+    client.close()
+
+    sent = by_name(statsd.sent)
+    assert sent["MetricsClient.get_item.status.200"] == 1
+    assert sent["MetricsClient.get_item.status.503"] == 1
+    assert sent["MetricsClient.get_item.errors"] == 1
+    assert sent["MetricsClient.get_item.response_bytes"] == len(b'{"id": "1"}')
+    assert sent["MetricsClient.create_item.request_bytes"] == len(b'{"id":"3"}')
+    assert sent["MetricsClient.create_item.latency"] > 0
+    assert statsd.packets == 1
+
+
+@pytest.mark.parametrize("client_cls", [AiohttpMetricsClient, HttpxMetricsClient])
+async def test_async_endpoint_metrics(aiohttp_client, client_cls):
+    async def handler(request):
+        return web.json_response({"id": request.match_info["item_id"]})
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", handler)
+    server = await aiohttp_client(app)
+    statsd = FakeStatsd()
+    client = client_cls(base_url=str(server.make_url("")).rstrip("/"))
+    client._statsd_client = statsd
+
+    assert await client.get_item("1") == Item(id="1")
+    await client.aclose()
+    sent = by_name(statsd.sent)
+    assert sent[f"{client_cls.__name__}.get_item.status.200"] == 1
+    assert sent[f"{client_cls.__name__}.get_item.response_bytes"] == len(b'{"id": "1"}')
+    assert f"{client_cls.__name__}.get_item.errors" not in sent
+
+
+def test_no_metrics_without_statsd():
+    client = MetricsClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        client.get_item("1")
+    assert client._metrics is None
+    client.flush_metrics()
+
+
+@pytest.mark.parametrize("client_cls", [AiohttpMetricsClient, HttpxMetricsClient])
+async def test_transport_metrics(aiohttp_client, client_cls):
+    async def handler(request):
+        return web.json_response({"id": request.match_info["item_id"]})
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", handler)
+    server = await aiohttp_client(app)
+    statsd = FakeStatsd()
+    client = client_cls(base_url=str(server.make_url("")).rstrip("/"), transport_metrics=True)
+    client._statsd_client = statsd
+
+    for item_id in ("1", "2", "3"):
+        await client.get_item(item_id)
+    await client.aclose()
+
+    host = f"{server.host}:{server.port}"
+    assert client.transport_stats() == {host: {
+        "requests": 3, "connections_created": 1, "connections_reused": 2, "reuse_ratio": 2 / 3
+    }}
+    prefix = f"{client_cls.__name__}.transport.{host.replace('.', '_').replace(':', '_')}"
+    sent = [(kind, stat) for kind, stat, _ in statsd.sent]
+    assert sent.count(("incr", f"{prefix}.connections.created")) == 1
+    assert sent.count(("incr", f"{prefix}.connections.reused")) == 2
+    assert sent.count(("timing", f"{prefix}.connect")) == 1
+    for name in ("send", "wait", "receive"):
+        assert sent.count(("timing", f"{prefix}.{name}")) == 3
+
+
+async def test_no_transport_metrics_by_default(aiohttp_client):
+    async def handler(request):
+        return web.json_response({"id": "1"})
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", handler)
+    server = await aiohttp_client(app)
+    client = AiohttpMetricsClient(base_url=str(server.make_url("")).rstrip("/"))
+    await client.get_item("1")
+    assert client.session.trace_configs == []
+    assert client.transport_stats() == {}
+    await client.aclose()
@@ -0,0 +1,165 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import get
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+from pydantic_client.resilience import HedgeTracker
+
+
+class Item(BaseModel):
+    id: str
+
+
+class AiohttpHedgeClient(AiohttpWebClient):
+    @get("/items/{item_id}", hedge_delay=0.05)
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+    @get("/items/{item_id}", hedge_delay="p95")
+    async def get_item_p95(self, item_id: str) -> Item:
+        ...
+
+
+class HttpxHedgeClient(HttpxWebClient):
+    @get("/items/{item_id}", hedge_delay=0.05)
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def make_app(delays):
+    """Each request to an item sleeps for the next delay of that item"""
+    calls = {"count": 0, "cancelled": 0}
+
+    async def handler(request):
+        calls["count"] += 1
+        item_id = request.match_info["item_id"]
+        try:
+            await asyncio.sleep(delays[item_id].pop(0) if delays[item_id] else 0)
+        except asyncio.CancelledError:
+            calls["cancelled"] += 1
+            raise
+        return web.json_response({"id": item_id})
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", handler)
+    return app, calls
+
+
+def test_tracker_delay():
+    assert HedgeTracker(0.1).delay() == 0.1
+
+    tracker = HedgeTracker("p90", min_samples=10)
+    for i in range(9):
+        tracker.observe(i / 100)
+    assert tracker.delay() is None
+    tracker.observe(0.09)
+    assert tracker.delay() == 0.09
+
+    with pytest.raises(ValueError):
+        HedgeTracker("fast")
+    with pytest.raises(ValueError):
+        @get("/items", hedge_delay="slow")
+        async def get_items(self) -> Item:
+            ...
+
+
+def test_tracker_percentile_refreshed_every_n_samples():
+    tracker = HedgeTracker("p50", min_samples=4, refresh_every=4)
+    for seconds in (0.1, 0.1, 0.1, 0.1):
+        tracker.observe(seconds)
+    assert tracker.delay() == 0.1
+    for _ in range(3):
+        tracker.observe(1.0)
+    # cached until `refresh_every` new latencies
+    assert tracker.delay() == 0.1
+    tracker.observe(1.0)
+    assert tracker.delay() == 1.0
+
+
+@pytest.mark.parametrize("client_cls", [AiohttpHedgeClient, HttpxHedgeClient])
+async def test_hedge_wins_over_slow_request(aiohttp_client, client_cls):
+    app, calls = make_app({"a": [1, 0]})
+    server = await aiohttp_client(app)
+    statsd = MagicMock()
+    client = client_cls(base_url=str(server.make_url("")).rstrip("/"))
+    client._statsd_client = statsd
+
+    start = asyncio.get_running_loop().time()
+    item = await client.get_item("a")
+    assert item == Item(id="a")
+    assert asyncio.get_running_loop().time() - start < 0.5
+    assert calls["count"] == 2
+    assert client.hedge_stats()["get_item"]["fired"] == 1
+    assert client.hedge_stats()["get_item"]["won"] == 1
+    statsd.incr.assert_any_call(f"{client_cls.__name__}.get_item.hedge.fired")
+    statsd.incr.assert_any_call(f"{client_cls.__name__}.get_item.hedge.won")
+    await client.aclose()
+
+
+async def test_fast_request_is_not_hedged(aiohttp_client):
+    app, calls = make_app({"a": []})
+    server = await aiohttp_client(app)
+    client = AiohttpHedgeClient(base_url=str(server.make_url("")).rstrip("/"))
+
+    assert await client.get_item("a") == Item(id="a")
+    assert calls["count"] == 1
+    assert client.hedge_stats()["get_item"]["fired"] == 0
+    await client.aclose()
+
+
+async def test_primary_wins_and_hedge_is_cancelled():
+    started = []
+    cancelled = []
+
+    class Client(AiohttpHedgeClient):
+        async def _request(self, request_info):
+            n = len(started)
+            started.append(n)
+            try:
+                await asyncio.sleep(0.08 if n == 0 else 1)
+            except asyncio.CancelledError:
+                cancelled.append(n)
+                raise
+            return Item(id=str(n))
+
+    client = Client(base_url="http://example.com")
+    assert await client.get_item("a") == Item(id="0")
+    await asyncio.sleep(0)
+    assert started == [0, 1]
+    assert cancelled == [1]
+    assert client.hedge_stats()["get_item"] == {"fired": 1, "won": 0, "delay": 0.05}
+
+
+async def test_failed_request_falls_back_to_other():
+    started = []
+
+    class Client(AiohttpHedgeClient):
+        async def _request(self, request_info):
+            n = len(started)
+            started.append(n)
+            await asyncio.sleep(0.1 if n == 0 else 0.2)
+            if n == 0:
+                raise ValueError("primary failed")
+            return Item(id=str(n))
+
+    client = Client(base_url="http://example.com")
+    assert await client.get_item("a") == Item(id="1")
+
+
+async def test_percentile_delay_needs_samples():
+    started = []
+
+    class Client(AiohttpHedgeClient):
+        async def _request(self, request_info):
+            started.append(request_info.function_name)
+            return Item(id="a")
+
+    client = Client(base_url="http://example.com")
+    for _ in range(25):
+        await client.get_item_p95("a")
+    assert len(started) == 25
+    assert client.hedge_stats()["get_item_p95"]["delay"] is not None
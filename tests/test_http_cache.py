@@ -0,0 +1,158 @@
+import pytest
+import requests_mock
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+from pydantic_client.cache import HttpCache, parse_cache_control
+
+
+class Catalog(BaseModel):
+    version: int
+
+
+class CatalogClient(RequestsWebClient):
+    @get("/catalog")
+    def get_catalog(self) -> Catalog:
+        ...
+
+
+class UserCatalogClient(RequestsWebClient):
+    @get("/catalog")
+    def get_catalog(self, request_headers: dict = None) -> dict:
+        ...
+
+
+class AiohttpCatalogClient(AiohttpWebClient):
+    @get("/catalog")
+    async def get_catalog(self) -> Catalog:
+        ...
+
+
+class HttpxCatalogClient(HttpxWebClient):
+    @get("/catalog")
+    async def get_catalog(self) -> Catalog:
+        ...
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('max-age=60, no-cache, private="x"') == {
+        "max-age": "60", "no-cache": None, "private": "x"
+    }
+    assert parse_cache_control(None) == {}
+
+
+def test_http_cache_freshness_and_vary():
+    now = [1000.0]
+    cache = HttpCache(clock=lambda: now[0])
+
+    cache.store("k", {"Accept-Language": "en"}, {"Cache-Control": "max-age=10", "Age": "2", "Vary": "Accept-Language"}, "v")
+    entry = cache.lookup("k", {"accept-language": "en"})
+    assert cache.is_fresh(entry)
+    assert cache.lookup("k", {"Accept-Language": "fr"}) is None
+
+    now[0] += 9
+    assert not cache.is_fresh(entry)
+
+    cache.store("no-store", {}, {"Cache-Control": "no-store", "ETag": '"1"'}, "v")
+    cache.store("nothing", {}, {}, "v")
+    assert cache.lookup("no-store", {}) is None
+    assert cache.lookup("nothing", {}) is None
+
+    cache.store("expires", {}, {"Date": "Wed, 21 Oct 2015 07:28:00 GMT",
+                                "Expires": "Wed, 21 Oct 2015 07:29:00 GMT"}, "v")
+    assert cache.is_fresh(cache.lookup("expires", {}))
+
+
+def test_conditional_request_reuses_body_on_304():
+    def catalog(request, context):
+        if request.headers.get("If-None-Match") == '"v1"':
+            context.status_code = 304
+            return ""
+        context.headers["ETag"] = '"v1"'
+        context.headers["Cache-Control"] = "no-cache"
+        return '{"version": 1}'
+
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/catalog", text=catalog)
+        client = CatalogClient(base_url="http://example.com", http_cache=True)
+
+        first = client.get_catalog()
+        second = client.get_catalog()
+
+        assert m.call_count == 2
+        assert "If-None-Match" not in m.request_history[0].headers
+        assert m.request_history[1].headers["If-None-Match"] == '"v1"'
+        assert second is first
+        assert client.http_cache.stats()["revalidations"] == 1
+
+
+def test_fresh_response_served_without_request():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/catalog", json={"version": 1}, headers={"Cache-Control": "max-age=60"})
+        client = CatalogClient.from_config({"base_url": "http://example.com", "http_cache": {"maxsize": 10}})
+
+        assert client.get_catalog() is client.get_catalog()
+        assert m.call_count == 1
+        assert client.http_cache.maxsize == 10
+
+
+def test_http_cache_keyed_by_credentials():
+    def catalog(request, context):
+        context.headers["Cache-Control"] = "private, max-age=60"
+        return {"user": request.headers["Authorization"].split()[-1]}
+
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/catalog", json=catalog)
+        client = UserCatalogClient(base_url="http://example.com", http_cache=True)
+
+        alice = {"Authorization": "Bearer alice"}
+        assert client.get_catalog(request_headers=alice) == {"user": "alice"}
+        assert client.get_catalog(request_headers={"Authorization": "Bearer bob"}) == {"user": "bob"}
+        assert client.get_catalog(request_headers=alice) == {"user": "alice"}
+        assert m.call_count == 2
+
+        client = UserCatalogClient(
+            base_url="http://example.com", headers={"Authorization": "Bearer carol"}, http_cache=True
+        )
+        assert client.get_catalog() == {"user": "carol"}
+        assert client.get_catalog() == {"user": "carol"}
+        assert m.call_count == 3
+
+
+def test_http_cache_disabled_by_default():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/catalog", json={"version": 1}, headers={"Cache-Control": "max-age=60"})
+        client = CatalogClient(base_url="http://example.com")
+        client.get_catalog()
+        client.get_catalog()
+        assert m.call_count == 2
+
+
+@pytest.fixture
+async def catalog_url(aiohttp_client):
+    calls = []
+
+    async def catalog(request):
+        calls.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"version": 1}, headers={"ETag": '"v1"', "Cache-Control": "max-age=0"})
+
+    app = web.Application()
+    app.router.add_get("/catalog", catalog)
+    server = await aiohttp_client(app)
+    yield str(server.make_url("")).rstrip("/"), calls
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client_cls", [AiohttpCatalogClient, HttpxCatalogClient])
+async def test_async_conditional_requests(catalog_url, client_cls):
+    url, calls = catalog_url
+    async with client_cls(base_url=url, http_cache=True) as client:
+        first = await client.get_catalog()
+        second = await client.get_catalog()
+
+    assert second is first
+    assert calls == [None, '"v1"']
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+import requests
+import requests_mock
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient
+from pydantic_client.metrics import LatencyHistogram
+
+
+class Item(BaseModel):
+    id: str
+
+
+class StatsClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram(precision=0.02)
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+
+    for q in (50, 90, 99):
+        assert histogram.percentile(q) == pytest.approx(q * 10 / 1000, rel=0.02)
+    assert histogram.percentile(100) == 1.0
+    assert histogram.max == 1.0
+
+
+def test_histogram_bounds_and_empty():
+    histogram = LatencyHistogram(min_value=0.001, max_value=1)
+    assert histogram.percentile(50) is None
+    assert histogram.snapshot()["p50_ms"] is None
+
+    histogram.record(0)
+    histogram.record(30, error=True)
+    assert histogram.percentile(50) == 0.001
+    assert histogram.percentile(100) == 30
+    stats = histogram.snapshot(percentiles=(50, 99.9))
+    assert stats["count"] == 2
+    assert stats["error_rate"] == 0.5
+    assert stats["max_ms"] == 30000
+    assert "p99.9_ms" in stats
+
+
+def test_client_stats_per_endpoint():
+    client = StatsClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        m.get("http://example.com/items/2", status_code=500)
+        for _ in range(3):
+            client.get_item("1")
+        with pytest.raises(requests.HTTPError):
+            client.get_item("2")
+
+    stats = client.stats()["get_item"]
+    assert stats["count"] == 4
+    assert stats["errors"] == 1
+    assert stats["error_rate"] == 0.25
+    assert 0 < stats["p50_ms"] <= stats["p90_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+    client.reset_stats()
+    assert client.stats() == {}
+
+
+async def test_cancelled_calls_in_stats():
+    class SlowClient(AiohttpWebClient):
+        @get("/items/{item_id}")
+        async def get_item(self, item_id: str) -> Item:
+            ...
+
+        async def _request(self, request_info):
+            await asyncio.sleep(1)
+
+    client = SlowClient(base_url="http://example.com")
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(client.get_item("1"), 0.05)
+
+    stats = client.stats()["get_item"]
+    assert stats["count"] == 1
+    assert stats["errors"] == 1
+    assert stats["cancelled"] == 1
+    assert stats["max_ms"] >= 40
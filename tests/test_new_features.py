@@ -133,4 +133,45 @@ def test_form_body_with_other_methods():
         # Test PATCH with form data  
         response = client.patch_user_form("123", user_request)
         assert 'application/x-www-form-urlencoded' in m.last_request.headers.get('content-type', '')
-        assert isinstance(response, User)
\ No newline at end of file
+        assert isinstance(response, User)
+
+def test_pydantic_model_body_pre_encoded():
+    """Pydantic model bodies are serialized straight to bytes, without model_dump"""
+    from pydantic import Field
+
+    class AliasRequest(BaseModel):
+        user_name: str = Field(serialization_alias="userName")
+
+        def model_dump(self, *args, **kwargs):
+            raise AssertionError("json bodies must not go through model_dump")
+
+    class CaptureClient(RequestsWebClient):
+        @post("/users")
+        def create_user(self, user: AliasRequest) -> User:
+            ...
+
+    with requests_mock.Mocker() as m:
+        m.post('http://example.com/users', json={"id": "1", "name": "a"})
+
+        client = CaptureClient(base_url="http://example.com")
+        client.create_user(AliasRequest(user_name="a"))
+
+        assert m.last_request.body == b'{"userName":"a"}'
+        assert m.last_request.headers.get('content-type') == 'application/json'
+
+
+def test_pre_encoded_body_json_data_view():
+    from pydantic_client.schema import ClientRequest
+
+    request = ClientRequest("POST", "/users", content=b'{"name":"a"}')
+    assert request.json_data == {"name": "a"}
+    assert request.to_request_info().json_data == {"name": "a"}
+
+    client = TestFormBodyClient(base_url="http://example.com")
+    params = client.dump_request_params(request)
+    assert params["content"] == b'{"name":"a"}'
+    assert params["json"] is None
+
+    request.json_data = {"name": "b"}
+    assert request.content is None
+    assert client.dump_request_params(request)["json"] == {"name": "b"}
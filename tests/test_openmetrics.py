@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+import requests
+import requests_mock
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient
+from pydantic_client.metrics import MetricsBackend
+from pydantic_client.openmetrics import OpenMetricsRegistry
+
+
+class Item(BaseModel):
+    id: str
+
+
+class PromClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def samples(text):
+    """sample line -> value"""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if line and not line.startswith("#")
+    }
+
+
+def test_exposition():
+    registry = OpenMetricsRegistry(buckets=(0.1, 1))
+    client = PromClient(base_url="http://example.com", metrics=registry)
+    # requests_mock bypasses the connection pools
+    client.pool_stats = lambda: {"http://example.com:80": {"maxsize": 10, "in_use": 1, "available": 9}}
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        m.get("http://example.com/items/2", status_code=500)
+        client.get_item("1")
+        with pytest.raises(requests.HTTPError):
+            client.get_item("2")
+        with client.span("handler"):
+            client.get_item("1")
+
+    text = registry.exposition()
+    assert text.endswith("# EOF\n")
+    assert "# TYPE pydantic_client_request_duration_seconds histogram" in text
+    assert "# TYPE pydantic_client_errors counter" in text
+
+    values = samples(text)
+    labels = 'client="PromClient",endpoint="get_item"'
+    assert values[f'pydantic_client_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 3
+    assert values[f'pydantic_client_request_duration_seconds_count{{{labels}}}'] == 3
+    assert values[f'pydantic_client_responses_total{{{labels},status="200"}}'] == 2
+    assert values[f'pydantic_client_responses_total{{{labels},status="500"}}'] == 1
+    assert values[f'pydantic_client_errors_total{{{labels}}}'] == 1
+    assert values[f'pydantic_client_response_bytes_total{{{labels}}}'] == 2 * len(b'{"id": "1"}')
+    assert values[f'pydantic_client_requests_in_flight{{{labels}}}'] == 0
+    assert values['pydantic_client_span_duration_seconds_count{span="handler"}'] == 1
+
+    pool = 'client="PromClient",pool="http://example.com:80"'
+    assert values[f'pydantic_client_pool_max_connections{{{pool}}}'] == 10
+    assert values[f'pydantic_client_pool_connections{{{pool},state="in_use"}}'] == 1
+    client.close()
+
+
+async def test_cancelled_calls_leave_flight():
+    class SlowClient(AiohttpWebClient):
+        @get("/items/{item_id}")
+        async def get_item(self, item_id: str) -> Item:
+            ...
+
+        async def _request(self, request_info):
+            await asyncio.sleep(1)
+
+    registry = OpenMetricsRegistry()
+    client = SlowClient(base_url="http://example.com", metrics=registry)
+    for item_id in "abc":
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get_item(item_id), 0.01)
+
+    values = samples(registry.exposition())
+    labels = 'client="SlowClient",endpoint="get_item"'
+    assert values[f'pydantic_client_requests_in_flight{{{labels}}}'] == 0
+    assert values[f'pydantic_client_request_duration_seconds_count{{{labels}}}'] == 3
+
+
+def test_empty_registry():
+    assert OpenMetricsRegistry().exposition() == "# EOF\n"
+
+
+def test_label_escaping():
+    registry = OpenMetricsRegistry()
+    registry.span('a "quoted"\\name', 0.2)
+    assert 'span="a \\"quoted\\"\\\\name"' in registry.exposition()
+
+
+def test_custom_backend_replaces_statsd(monkeypatch):
+    class Recorder(MetricsBackend):
+        def __init__(self):
+            self.calls = []
+
+        def call_finished(self, client, endpoint, seconds, status, error, request_bytes, response_bytes):
+            self.calls.append((client, endpoint, status, error))
+
+    monkeypatch.setattr("statsd.StatsClient", lambda host, port: pytest.fail("statsd used"))
+    backend = Recorder()
+    client = PromClient(base_url="http://example.com", metrics=backend)
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        client.get_item("1")
+    assert backend.calls == [("PromClient", "get_item", 200, False)]
@@ -0,0 +1,97 @@
+import requests_mock
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+
+TRANSFER_PHASES = ["connect", "ttfb", "body_read"]
+
+
+class Item(BaseModel):
+    id: str
+
+
+class SyncClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+
+class AiohttpClient(AiohttpWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+class HttpxClient(HttpxWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, function_name, phase, seconds):
+        assert seconds >= 0
+        self.events.append((function_name, phase))
+
+    @property
+    def phases(self):
+        return [phase for _, phase in self.events]
+
+
+def test_sync_phases():
+    recorder = Recorder()
+    client = SyncClient(base_url="http://example.com")
+    client.add_phase_listener(recorder)
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        assert client.get_item("1") == Item(id="1")
+
+    assert recorder.phases == ["process_params", "before_request", "ttfb", "body_read", "validate"]
+    assert {name for name, _ in recorder.events} == {"get_item"}
+
+
+def test_no_listener_no_timing():
+    recorder = Recorder()
+    client = SyncClient(base_url="http://example.com")
+    client.add_phase_listener(recorder)
+    client.remove_phase_listener(recorder)
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        client.get_item("1")
+    assert recorder.events == []
+
+
+def test_failing_listener_does_not_fail_the_call():
+    def broken(function_name, phase, seconds):
+        raise RuntimeError("boom")
+
+    client = SyncClient(base_url="http://example.com")
+    client.add_phase_listener(broken)
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        assert client.get_item("1") == Item(id="1")
+
+
+async def test_async_phases(aiohttp_client):
+    async def handler(request):
+        return web.json_response({"id": request.match_info["item_id"]})
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", handler)
+    server = await aiohttp_client(app)
+    url = str(server.make_url("")).rstrip("/")
+
+    for client_cls in (AiohttpClient, HttpxClient):
+        recorder = Recorder()
+        client = client_cls(base_url=url)
+        client.add_phase_listener(recorder)
+        await client.get_item("1")
+        await client.get_item("2")
+        expected = ["process_params", "before_request"] + TRANSFER_PHASES + ["validate"]
+        assert recorder.phases == expected * 2
+        await client.aclose()
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import pytest
+import requests
+import requests_mock
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient
+from pydantic_client.resilience import RateLimiter
+
+SHARED = RateLimiter(rate=1000, burst=1)
+
+
+class Item(BaseModel):
+    id: str
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LimitedClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+    @get("/slow/{item_id}", rate_limit=20)
+    def get_slow(self, item_id: str) -> Item:
+        ...
+
+    @get("/shared/{item_id}", rate_limit=SHARED)
+    def get_shared(self, item_id: str) -> Item:
+        ...
+
+
+class AsyncLimitedClient(AiohttpWebClient):
+    @get("/items/{item_id}", rate_limit=50)
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, burst=2, clock=clock)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)
+
+    clock.now = 1
+    assert limiter.reserve() == 0
+    limiter.pause(3)
+    assert limiter.reserve() == pytest.approx(3.1)
+    assert limiter.stats()["rate"] == 10
+
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+
+
+async def test_cancelled_waiters_return_their_tokens():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, burst=1, clock=clock)
+    assert limiter.reserve() == 0
+    waiters = [asyncio.ensure_future(limiter.acquire_async()) for _ in range(5)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(waiter.cancelled() for waiter in waiters)
+    # the next caller waits for one slot, not behind the 5 abandoned ones
+    assert limiter.reserve() == pytest.approx(0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.acquire_async(), 0.01)
+    assert limiter.reserve() == pytest.approx(0.2)
+
+
+def test_sync_endpoint_limit_blocks():
+    client = LimitedClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/slow/1", json={"id": "1"})
+        start = time.perf_counter()
+        for _ in range(5):
+            client.get_slow("1")
+        # burst of 20 tokens: no wait
+        assert time.perf_counter() - start < 0.2
+
+    client = LimitedClient(base_url="http://example.com", rate_limit={"rate": 20, "burst": 1})
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        start = time.perf_counter()
+        for _ in range(4):
+            client.get_item("1")
+        assert time.perf_counter() - start >= 0.14
+
+
+def test_client_and_endpoint_limiters():
+    client = LimitedClient.from_config({"base_url": "http://example.com", "rate_limit": 100})
+    other = LimitedClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.get(requests_mock.ANY, json={"id": "1"})
+        for c in (client, other):
+            c.get_item("1")
+            c.get_slow("1")
+            c.get_shared("1")
+
+    slow = client._rate_limiters["get_slow"]
+    assert [limiter.rate for limiter in slow] == [100, 20]
+    # numeric endpoint limits are per client instance, RateLimiter instances are shared
+    assert other._rate_limiters["get_slow"][0] is not slow[1]
+    assert other._rate_limiters["get_shared"] == (SHARED,)
+    assert other._rate_limiters["get_item"] == ()
+
+
+def test_retry_after_pauses_limiter():
+    client = LimitedClient(base_url="http://example.com", rate_limit=100)
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", status_code=429, headers={"Retry-After": "2"})
+        with pytest.raises(requests.HTTPError):
+            client.get_item("1")
+    assert client.rate_limit.reserve() > 1.9
+
+    client = LimitedClient(base_url="http://example.com", rate_limit=RateLimiter(100, respect_retry_after=False))
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", status_code=429, headers={"Retry-After": "2"})
+        with pytest.raises(requests.HTTPError):
+            client.get_item("1")
+    assert client.rate_limit.reserve() == 0
+
+
+async def test_async_limit_waits_without_blocking():
+    calls = []
+
+    class Client(AsyncLimitedClient):
+        async def _request(self, request_info):
+            calls.append(time.perf_counter())
+            return Item(id="1")
+
+    client = Client(base_url="http://example.com", rate_limit=RateLimiter(rate=50, burst=1))
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.gather(*(client.get_item("1") for _ in range(6)))
+    task.cancel()
+    assert calls[-1] - calls[0] >= 0.09
+    assert ticks > 5
@@ -0,0 +1,82 @@
+import pytest
+import requests_mock
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient
+from pydantic_client.cache import MISSING, TTLCache
+
+
+class Flag(BaseModel):
+    name: str
+    enabled: bool
+
+
+class FlagClient(RequestsWebClient):
+    @get("/flags/{name}?env={env}", cache_ttl=30, cache_maxsize=2, cache_headers=("X-Tenant",))
+    def get_flag(self, name: str, env: str = "prod", request_headers: dict = None) -> Flag:
+        ...
+
+    @get("/flags/{name}/uncached")
+    def get_flag_uncached(self, name: str) -> Flag:
+        ...
+
+
+class AsyncFlagClient(AiohttpWebClient):
+    @get("/users/{user_id}", cache_ttl=30)
+    async def get_user(self, user_id: str) -> dict:
+        ...
+
+
+def test_ttl_cache_expiry_and_lru():
+    now = [0.0]
+    cache = TTLCache(ttl=10, maxsize=2, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is MISSING
+    now[0] = 11
+    assert cache.get("a") is MISSING
+    assert cache.stats() == {
+        "size": 1, "maxsize": 2, "hits": 1, "misses": 2, "evictions": 1, "expirations": 1
+    }
+
+
+def test_cached_endpoint_skips_network_and_validation():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/flags/a", json={"name": "a", "enabled": True})
+        m.get("http://example.com/flags/a/uncached", json={"name": "a", "enabled": True})
+        client = FlagClient(base_url="http://example.com")
+
+        first = client.get_flag("a")
+        second = client.get_flag("a")
+        assert first is second
+        assert m.call_count == 1
+
+        client.get_flag("a", env="dev")
+        client.get_flag("a", request_headers={"X-Tenant": "t1"})
+        assert m.call_count == 3
+
+        stats = client.cache_stats()["get_flag"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+        assert stats["evictions"] == 1
+        assert stats["size"] == 2
+
+        client.clear_cache("get_flag")
+        client.get_flag("a", request_headers={"X-Tenant": "t1"})
+        assert m.call_count == 4
+
+        client.get_flag_uncached("a")
+        client.get_flag_uncached("a")
+        assert m.call_count == 6
+        assert "get_flag_uncached" not in client.cache_stats()
+
+
+@pytest.mark.asyncio
+async def test_async_cached_endpoint(mock_server, base_url):
+    async with AsyncFlagClient(base_url=base_url) as client:
+        first = await client.get_user("1")
+        assert await client.get_user("1") is first
+        assert client.cache_stats()["get_user"]["hits"] == 1
@@ -0,0 +1,193 @@
+import pytest
+import requests
+import requests_mock
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get, post
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+from pydantic_client.resilience import RetryBudget, RetryPolicy, parse_retry_after
+
+NO_WAIT = RetryPolicy(max_attempts=3, backoff_base=0, jitter=False)
+
+
+class Item(BaseModel):
+    id: str
+
+
+class RetryClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+    @get("/items/{item_id}/once", retry=False)
+    def get_item_once(self, item_id: str) -> Item:
+        ...
+
+    @post("/items")
+    def create_item(self, id: str) -> Item:
+        ...
+
+    @post("/items/retried", retry=RetryPolicy(max_attempts=2, backoff_base=0, methods=("POST",)))
+    def create_item_retried(self, id: str) -> Item:
+        ...
+
+
+class AiohttpRetryClient(AiohttpWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+class HttpxRetryClient(HttpxWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def test_policy_decisions():
+    policy = RetryPolicy(max_attempts=3, backoff_base=1, backoff_max=3, jitter=False)
+    assert policy.is_retryable("get", ValueError(), 503)
+    assert not policy.is_retryable("GET", ValueError(), 404)
+    assert not policy.is_retryable("POST", ValueError(), 503)
+    assert policy.is_retryable("GET", ConnectionError(), None, (ConnectionError,))
+    assert not policy.is_retryable("GET", ValueError(), None, (ConnectionError,))
+
+    assert policy.get_delay(1) == 1
+    assert policy.get_delay(2) == 2
+    assert policy.get_delay(3) is None
+    assert policy.get_delay(1, retry_after=2.5) == 2.5
+    assert policy.get_delay(1, retry_after=60) is None
+    assert 0 <= RetryPolicy(backoff_base=1).backoff(3) <= 4
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", clock=lambda: 1445412480) == 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_budget():
+    now = [0.0]
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0, ttl=10, clock=lambda: now[0])
+    for _ in range(4):
+        budget.deposit()
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    now[0] = 11
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+def test_sync_retries_status_and_transport_errors():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", [
+            {"status_code": 503},
+            {"exc": requests.ConnectionError},
+            {"json": {"id": "1"}},
+        ])
+        client = RetryClient(base_url="http://example.com", retry_policy=NO_WAIT)
+        assert client.get_item("1").id == "1"
+        assert m.call_count == 3
+
+
+def test_sync_gives_up_after_max_attempts():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", status_code=503)
+        client = RetryClient.from_config({
+            "base_url": "http://example.com",
+            "retry_policy": {"max_attempts": 2, "backoff_base": 0}
+        })
+        with pytest.raises(requests.HTTPError):
+            client.get_item("1")
+        assert m.call_count == 2
+
+
+def test_sync_no_retry_for_post_or_disabled_endpoint():
+    with requests_mock.Mocker() as m:
+        m.post("http://example.com/items", status_code=503)
+        m.post("http://example.com/items/retried", [{"status_code": 503}, {"json": {"id": "2"}}])
+        m.get("http://example.com/items/1/once", status_code=503)
+        client = RetryClient(base_url="http://example.com", retry_policy=NO_WAIT)
+
+        with pytest.raises(requests.HTTPError):
+            client.create_item("1")
+        with pytest.raises(requests.HTTPError):
+            client.get_item_once("1")
+        assert m.call_count == 2
+
+        assert client.create_item_retried("2").id == "2"
+
+
+def test_sync_respects_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", [
+            {"status_code": 429, "headers": {"Retry-After": "2"}},
+            {"json": {"id": "1"}},
+        ])
+        client = RetryClient(base_url="http://example.com", retry_policy=RetryPolicy())
+        client.get_item("1")
+    assert sleeps == [2.0]
+
+
+def test_sync_budget_stops_retries():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", status_code=503)
+        client = RetryClient(
+            base_url="http://example.com",
+            retry_policy=NO_WAIT,
+            retry_budget=RetryBudget(ratio=0, min_retries_per_second=0)
+        )
+        with pytest.raises(requests.HTTPError):
+            client.get_item("1")
+        assert m.call_count == 1
+
+
+@pytest.fixture
+async def flaky_url(aiohttp_client):
+    calls = []
+
+    async def item(request):
+        calls.append(request.match_info["item_id"])
+        if len(calls) == 1:
+            return web.Response(status=503)
+        return web.json_response({"id": request.match_info["item_id"]})
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", item)
+    server = await aiohttp_client(app)
+    yield str(server.make_url("")).rstrip("/"), calls
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client_cls", [AiohttpRetryClient, HttpxRetryClient])
+async def test_async_retries(flaky_url, client_cls):
+    url, calls = flaky_url
+    async with client_cls(base_url=url, retry_policy=NO_WAIT) as client:
+        assert (await client.get_item("1")).id == "1"
+    assert calls == ["1", "1"]
+
+
+@pytest.mark.asyncio
+async def test_async_transport_error_retried():
+    client = HttpxRetryClient(base_url="http://127.0.0.1:1", retry_policy=NO_WAIT)
+    attempts = []
+    original = client._request
+
+    async def counting(request_info):
+        attempts.append(1)
+        return await original(request_info)
+
+    client._request = counting
+    import httpx
+    with pytest.raises(httpx.ConnectError):
+        await client.get_item("1")
+    assert len(attempts) == 3
+    await client.aclose()
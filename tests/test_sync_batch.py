@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+import requests_mock
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+
+
+class User(BaseModel):
+    id: str
+
+
+class SlowClient(RequestsWebClient):
+    def __init__(self, **kwargs):
+        super().__init__(base_url="http://example.com", **kwargs)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _request(self, request_info):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.02)
+            user_id = request_info.path.rsplit("/", 1)[-1]
+            if user_id == "bad":
+                raise ValueError("bad user")
+            return user_id
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    @get("/users/{user_id}")
+    def get_user(self, user_id: str) -> User:
+        ...
+
+
+class UserClient(RequestsWebClient):
+    @get("/users/{user_id}")
+    def get_user(self, user_id: str) -> User:
+        ...
+
+
+def test_map_keeps_order_and_uses_workers():
+    with SlowClient(max_workers=4) as client:
+        results = client.map(client.get_user, [{"user_id": str(i)} for i in range(12)])
+        assert results == [str(i) for i in range(12)]
+        assert client.max_in_flight == 4
+
+
+def test_map_limits_in_flight():
+    with SlowClient(max_workers=8) as client:
+        client.map("get_user", [str(i) for i in range(8)], max_workers=2)
+        assert client.max_in_flight == 2
+
+
+def test_default_workers_follow_pool_size():
+    client = SlowClient(pool_maxsize=32)
+    assert client.max_workers == 32
+
+
+def test_map_collects_exceptions():
+    with SlowClient() as client:
+        results = client.map("get_user", ["1", "bad", ("2",)])
+        assert results[0] == "1"
+        assert isinstance(results[1], ValueError)
+        assert results[2] == "2"
+
+        with pytest.raises(ValueError):
+            client.map("get_user", ["bad", "1"], return_exceptions=False)
+
+
+def test_submit_shares_session():
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/users/1", json={"id": "1"})
+        m.get("http://example.com/users/2", json={"id": "2"})
+
+        with UserClient(base_url="http://example.com") as client:
+            futures = [client.submit(client.get_user, "1"), client.submit("get_user", user_id="2")]
+            assert [future.result().id for future in futures] == ["1", "2"]
+            assert m.call_count == 2
@@ -121,3 +121,42 @@ def test_sync_get_dict_request():
 
         assert isinstance(response, dict)
         assert response == {"user": 123}
+
+
+def test_pool_options_mount_adapter():
+    client = TestClient.from_config({
+        "base_url": "http://example.com",
+        "pool_connections": 4,
+        "pool_maxsize": 64,
+        "pool_block": True
+    })
+    adapter = client.session.get_adapter("https://example.com")
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 64
+    assert adapter._pool_block is True
+    assert adapter.max_retries.total == 0
+
+
+def test_pool_stats():
+    client = TestClient(base_url="http://example.com", pool_maxsize=8)
+    assert client.pool_stats() == {}
+
+    adapter = client.session.get_adapter("http://example.com")
+    pool = adapter.poolmanager.connection_from_url("http://example.com")
+    conn = pool._get_conn()
+
+    stats = client.pool_stats()["http://example.com:80"]
+    assert stats["maxsize"] == 8
+    assert stats["in_use"] == 1
+    assert stats["available"] == 7
+
+    pool._put_conn(conn)
+    assert client.pool_stats()["http://example.com:80"]["in_use"] == 0
+
+
+def test_external_session_kept():
+    session = requests.Session()
+    default_adapter = session.get_adapter("http://example.com")
+    with TestClient(base_url="http://example.com", session=session) as client:
+        assert client.session is session
+        assert session.get_adapter("http://example.com") is default_adapter
@@ -0,0 +1,125 @@
+import asyncio
+
+import requests_mock
+from aiohttp import web
+from pydantic import BaseModel
+
+from pydantic_client import RequestsWebClient, get
+from pydantic_client.async_client import AiohttpWebClient, HttpxWebClient
+from pydantic_client.tracing import current_span
+
+
+class Item(BaseModel):
+    id: str
+
+
+class TracedClient(RequestsWebClient):
+    @get("/items/{item_id}")
+    def get_item(self, item_id: str) -> Item:
+        ...
+
+
+class AiohttpTracedClient(AiohttpWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+class HttpxTracedClient(HttpxWebClient):
+    @get("/items/{item_id}")
+    async def get_item(self, item_id: str) -> Item:
+        ...
+
+
+def names(span):
+    return [child.name for child in span.children]
+
+
+def test_sync_span_tree_and_export():
+    exported = []
+    client = TracedClient(base_url="http://example.com")
+    client.span_exporter = exported.append
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        with client.span("handler"):
+            with client.span("load"):
+                client.get_item("1")
+            assert current_span().name == "handler"
+        assert current_span() is None
+
+    root = exported[0]
+    assert root.name == "handler"
+    assert names(root) == ["load"]
+    call = root.children[0].children[0]
+    assert call.name == "TracedClient.get_item"
+    assert names(call) == ["build", "serialize", "network", "parse"]
+    assert call.attributes == {"method": "GET", "path": "/items/1", "status": 200}
+
+    tree = client.export_spans()
+    assert tree[0]["name"] == "handler"
+    assert tree[0]["start_ms"] == 0
+    assert tree[0]["children"][0]["children"][0]["children"][2]["name"] == "network"
+    assert client.export_spans() == []
+
+
+def test_calls_outside_spans_are_not_traced():
+    client = TracedClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", json={"id": "1"})
+        client.get_item("1")
+    assert list(client.finished_spans) == []
+
+
+def test_threads_inherit_the_current_span():
+    client = TracedClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.get(requests_mock.ANY, json={"id": "1"})
+        with client.span("batch"):
+            client.map("get_item", ["1", "2", "3"])
+    root = client.finished_spans[0]
+    assert names(root) == ["TracedClient.get_item"] * 3
+    client.close()
+
+
+async def test_concurrent_tasks_nest_independently(aiohttp_client):
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return web.json_response({"id": request.match_info["item_id"]})
+
+    app = web.Application()
+    app.router.add_get("/items/{item_id}", handler)
+    server = await aiohttp_client(app)
+    url = str(server.make_url("")).rstrip("/")
+
+    for client_cls in (AiohttpTracedClient, HttpxTracedClient):
+        client = client_cls(base_url=url)
+
+        async def task(name):
+            async with client.span(name):
+                await client.get_item(name)
+
+        async with client.span("handler"):
+            await asyncio.gather(task("a"), task("b"))
+
+        root = client.finished_spans[-1]
+        assert sorted(names(root)) == ["a", "b"]
+        for child in root.children:
+            assert names(child) == [f"{client_cls.__name__}.get_item"]
+            assert names(child.children[0]) == ["build", "serialize", "network", "parse"]
+            assert child.children[0].attributes["path"] == f"/items/{child.name}"
+        await client.aclose()
+
+
+def test_failed_call_span():
+    client = TracedClient(base_url="http://example.com")
+    with requests_mock.Mocker() as m:
+        m.get("http://example.com/items/1", status_code=500)
+        try:
+            with client.span("handler"):
+                client.get_item("1")
+        except Exception:
+            pass
+    root = client.finished_spans[0]
+    assert root.attributes["error"] == "HTTPError"
+    assert root.children[0].attributes["status"] == 500
+    assert root.children[0].attributes["error"] == "HTTPError"